@@ -2,11 +2,20 @@
 # Author: Sanjeev Maharjan <me@sanjeev.au>
 
 import asyncio
+import base64
 import subprocess
-from typing import Optional
+from typing import Optional, Tuple
+
+try:
+  import boto3
+except ImportError:
+  boto3 = None
 
 from core.config import Config
+from registries.jfrog import parse_jfrog_url
+from utils.aio import validate_all
 from utils.logger import Logger
+from utils.process import run_command
 from utils.types import ValidationResult
 
 
@@ -14,6 +23,17 @@ class RegistryAuthenticator:
   def __init__(self, config: Config, logger: Logger):
     self.config = config
     self.logger = logger
+    self._docker_config_lock: Optional[asyncio.Lock] = None
+
+  async def _update_docker_config(self, *args) -> Tuple[bool, str, str]:
+    """Run a command that rewrites ~/.docker/config.json, one at a time"""
+    # crane and gcloud both read-modify-write the file, concurrent
+    # writers would drop each other's entries
+    if self._docker_config_lock is None:
+      self._docker_config_lock = asyncio.Lock()
+
+    async with self._docker_config_lock:
+      return await run_command(*args, capture=False)
 
   async def authenticate_all(self) -> ValidationResult:
     """Authenticate to all configured registries"""
@@ -36,16 +56,14 @@ class RegistryAuthenticator:
     if self.config.docr_token:
       auth_tasks.append(self._authenticate_docr())
 
-    # Execute all authentications
-    results = await asyncio.gather(*auth_tasks, return_exceptions=True)
-
-    # Check for failures
-    failures = [r for r in results if isinstance(r, Exception) or (isinstance(r, ValidationResult) and not r.success)]
+    # Execute all authentications, stopping at the first failure rather than
+    # waiting on slower providers for a run that is already going to abort
+    result = await validate_all(auth_tasks)
 
-    if failures:
+    if not result.success:
       return ValidationResult(
         success=False,
-        message=f"Authentication failed for {len(failures)} registries"
+        message=f"Authentication failed: {result.message}"
       )
 
     self.logger.success("Authentication complete")
@@ -56,51 +74,95 @@ class RegistryAuthenticator:
     self.logger.debug("Authenticating to AWS ECR regions...")
 
     try:
-      for region in self.config.ecr_regions:
-        # Get ECR login token
-        proc = await asyncio.create_subprocess_exec(
-          'aws', 'ecr', 'get-login-password', '--region', region,
-          stdout=asyncio.subprocess.PIPE,
-          stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await proc.communicate()
+      account_id = await self._get_aws_account_id()
+      if not account_id:
+        return ValidationResult(success=False, message="Unable to determine AWS account ID")
 
-        if proc.returncode != 0:
-          self.logger.warning(f"ECR authentication failed for {region}: {stderr.decode()}")
-          continue
+      # Regions are independent, log in to all of them concurrently
+      results = await asyncio.gather(*[
+        self._ecr_login_region(region, account_id)
+        for region in self.config.ecr_regions
+      ])
 
-        token = stdout.decode().strip()
+    except Exception as e:
+      return ValidationResult(success=False, message=f"ECR auth error: {e}")
 
-        # Get AWS account ID
-        proc = await asyncio.create_subprocess_exec(
-          'aws', 'sts', 'get-caller-identity', '--query', 'Account', '--output', 'text',
-          stdout=asyncio.subprocess.PIPE,
-          stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await proc.communicate()
+    for result in results:
+      if not result.success:
+        self.logger.warning(result.message)
 
-        if proc.returncode != 0:
-          continue
+    if not any(result.success for result in results):
+      return ValidationResult(success=False, message="ECR login failed for every region")
 
-        account_id = stdout.decode().strip()
-        ecr_url = f"{account_id}.dkr.ecr.{region}.amazonaws.com"
+    return ValidationResult(success=True)
 
-        # Login with crane
-        proc = await asyncio.create_subprocess_exec(
-          'crane', 'auth', 'login', '-u', 'AWS', '-p', token, ecr_url,
-          stdout=asyncio.subprocess.PIPE,
-          stderr=asyncio.subprocess.PIPE
-        )
-        await proc.communicate()
+  async def _get_aws_account_id(self) -> Optional[str]:
+    """Resolve the AWS account ID once and cache it on the config"""
+    if self.config.aws_account_id:
+      return self.config.aws_account_id
 
-        if proc.returncode == 0:
-          self.logger.debug(f"Authenticated to ECR region: {region}")
+    if boto3 is not None:
+      success, stdout, stderr = await self._run_boto3(self._boto3_account_id)
+    else:
+      success, stdout, stderr = await run_command(
+        'aws', 'sts', 'get-caller-identity', '--query', 'Account', '--output', 'text'
+      )
 
-    except Exception as e:
-      return ValidationResult(success=False, message=f"ECR auth error: {e}")
+    if not success:
+      self.logger.warning(f"Failed to get AWS account ID: {stderr}")
+      return None
+
+    self.config.aws_account_id = stdout
+    return self.config.aws_account_id
+
+  async def _ecr_login_region(self, region: str, account_id: str) -> ValidationResult:
+    """Log crane in to the ECR registry of a single region"""
+    # Get ECR login token
+    if boto3 is not None:
+      success, token, stderr = await self._run_boto3(self._boto3_ecr_password, region)
+    else:
+      success, token, stderr = await run_command(
+        'aws', 'ecr', 'get-login-password', '--region', region
+      )
+
+    if not success:
+      self.logger.warning(f"ECR authentication failed for {region}: {stderr}")
+      return ValidationResult(success=False, message=f"ECR login token unavailable for {region}")
+
+    ecr_url = f"{account_id}.dkr.ecr.{region}.amazonaws.com"
 
+    # Login with crane
+    success, _, stderr = await self._update_docker_config(
+      'crane', 'auth', 'login', '-u', 'AWS', '-p', token, ecr_url
+    )
+
+    if not success:
+      return ValidationResult(success=False, message=f"crane login failed for ECR region {region}")
+
+    self.logger.debug(f"Authenticated to ECR region: {region}")
     return ValidationResult(success=True)
 
+  async def _run_boto3(self, func, *args) -> Tuple[bool, str, str]:
+    """Run a blocking boto3 call in the default executor"""
+    try:
+      loop = asyncio.get_running_loop()
+      return True, await loop.run_in_executor(None, func, *args), ''
+    except Exception as e:
+      return False, '', str(e)
+
+  @staticmethod
+  def _boto3_account_id() -> str:
+    """Resolve the AWS account ID in-process, avoiding an aws CLI cold start"""
+    # Sessions are not thread-safe, each executor call gets its own
+    return boto3.session.Session().client('sts').get_caller_identity()['Account']
+
+  @staticmethod
+  def _boto3_ecr_password(region: str) -> str:
+    """Fetch the ECR login password for a region in-process"""
+    ecr = boto3.session.Session().client('ecr', region_name=region)
+    auth = ecr.get_authorization_token()['authorizationData'][0]
+    return base64.b64decode(auth['authorizationToken']).decode().split(':', 1)[1]
+
   async def _authenticate_gar(self) -> ValidationResult:
     """Authenticate to Google Artifact Registry"""
     self.logger.debug("Authenticating to Google GAR...")
@@ -108,27 +170,24 @@ class RegistryAuthenticator:
     try:
       # Set service account impersonation if specified
       if self.config.gcp_service_account:
-        proc = await asyncio.create_subprocess_exec(
+        await run_command(
           'gcloud', 'config', 'set', 'auth/impersonate_service_account',
           self.config.gcp_service_account, '--quiet',
-          stdout=asyncio.subprocess.PIPE,
-          stderr=asyncio.subprocess.PIPE
+          capture=False
         )
-        await proc.communicate()
 
-      # Configure Docker auth for each GAR region
-      for region in self.config.gcp_regions:
-        gar_host = f"{region}-docker.pkg.dev"
+      # One configure-docker call covers every region, gcloud accepts a
+      # comma-separated host list and only pays its startup cost once
+      gar_hosts = [f"{region}-docker.pkg.dev" for region in self.config.gcp_regions]
 
-        proc = await asyncio.create_subprocess_exec(
-          'gcloud', 'auth', 'configure-docker', gar_host, '--quiet',
-          stdout=asyncio.subprocess.PIPE,
-          stderr=asyncio.subprocess.PIPE
-        )
-        await proc.communicate()
+      success, _, stderr = await self._update_docker_config(
+        'gcloud', 'auth', 'configure-docker', ','.join(gar_hosts), '--quiet'
+      )
 
-        if proc.returncode == 0:
-          self.logger.debug(f"Configured Docker auth for GAR region: {region}")
+      if success:
+        self.logger.debug(f"Configured Docker auth for GAR hosts: {', '.join(gar_hosts)}")
+      else:
+        self.logger.warning(f"GAR Docker auth configuration failed: {stderr}")
 
     except Exception as e:
       return ValidationResult(success=False, message=f"GAR auth error: {e}")
@@ -142,17 +201,15 @@ class RegistryAuthenticator:
     try:
       # Service principal login if credentials provided
       if all([self.config.azure_client_id, self.config.azure_client_secret, self.config.azure_tenant_id]):
-        proc = await asyncio.create_subprocess_exec(
+        success, _, stderr = await run_command(
           'az', 'login', '--service-principal',
           '-u', self.config.azure_client_id,
           '-p', self.config.azure_client_secret,
           '--tenant', self.config.azure_tenant_id,
-          stdout=asyncio.subprocess.PIPE,
-          stderr=asyncio.subprocess.PIPE
+          capture=False
         )
-        await proc.communicate()
 
-        if proc.returncode != 0:
+        if not success:
           return ValidationResult(success=False, message="Azure service principal login failed")
 
     except Exception as e:
@@ -168,20 +225,16 @@ class RegistryAuthenticator:
       if not all([self.config.jfrog_url, self.config.jfrog_user, self.config.jfrog_token]):
         return ValidationResult(success=False, message="Missing JFrog credentials")
 
-      # Extract hostname from URL
-      jfrog_host = self.config.jfrog_url.replace('https://', '').replace('http://', '').split('/')[0]
+      jfrog_host, _ = parse_jfrog_url(self.config.jfrog_url)
 
-      proc = await asyncio.create_subprocess_exec(
+      success, _, stderr = await self._update_docker_config(
         'crane', 'auth', 'login',
         '-u', self.config.jfrog_user,
         '-p', self.config.jfrog_token,
-        jfrog_host,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
+        jfrog_host
       )
-      await proc.communicate()
 
-      if proc.returncode != 0:
+      if not success:
         return ValidationResult(success=False, message="JFrog authentication failed")
 
       self.logger.debug(f"Authenticated to JFrog: {jfrog_host}")
@@ -200,17 +253,14 @@ class RegistryAuthenticator:
         return ValidationResult(success=False, message="DOCR_TOKEN not set")
 
       # Login with crane
-      proc = await asyncio.create_subprocess_exec(
+      success, _, stderr = await self._update_docker_config(
         'crane', 'auth', 'login',
         '-u', 'unused',
         '-p', self.config.docr_token,
-        'registry.digitalocean.com',
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
+        'registry.digitalocean.com'
       )
-      await proc.communicate()
 
-      if proc.returncode != 0:
+      if not success:
         return ValidationResult(success=False, message="DOCR authentication failed")
 
       self.logger.debug("Authenticated to DigitalOcean Container Registry")
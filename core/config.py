@@ -47,6 +47,14 @@ class Config:
   docr_token: Optional[str]
   docr_registry_name: Optional[str]
 
+  # Tuning
+  retry_backoff_cap: int = 60
+  ecr_qps: int = 10
+  gar_qps: int = 10
+  acr_qps: int = 10
+  jfrog_qps: int = 10
+  docr_qps: int = 10
+
 
 class ConfigManager:
   def __init__(self, image_list_file: str, max_parallel_jobs: int,
@@ -75,13 +83,13 @@ class ConfigManager:
 
   def _load_regions_conf(self, config_file: Path):
     """Load additional config from regions.conf"""
-    with open(config_file, 'r') as f:
-      for line in f:
-        line = line.strip()
-        if line and not line.startswith('#'):
-          if '=' in line:
-            key, value = line.split('=', 1)
-            os.environ[key.strip()] = value.strip().strip('"\'')
+    for line in config_file.read_text().splitlines():
+      line = line.strip()
+      if not line or line[0] == '#' or '=' not in line:
+        continue
+
+      key, _, value = line.partition('=')
+      os.environ[key.strip()] = value.strip().strip('"\'')
 
   def _parse_regions(self, env_var: str) -> Optional[List[str]]:
     """Parse comma-separated regions from environment variable"""
@@ -128,5 +136,13 @@ class ConfigManager:
       # DigitalOcean
       docr_regions=self._parse_regions('DOCR_REGIONS'),
       docr_token=os.getenv('DOCR_TOKEN'),
-      docr_registry_name=os.getenv('DOCR_REGISTRY_NAME')
+      docr_registry_name=os.getenv('DOCR_REGISTRY_NAME'),
+
+      # Tuning
+      retry_backoff_cap=int(os.getenv('RETRY_BACKOFF_CAP', '60')),
+      ecr_qps=int(os.getenv('ECR_QPS', '10')),
+      gar_qps=int(os.getenv('GAR_QPS', '10')),
+      acr_qps=int(os.getenv('ACR_QPS', '10')),
+      jfrog_qps=int(os.getenv('JFROG_QPS', '10')),
+      docr_qps=int(os.getenv('DOCR_QPS', '10'))
     )
@@ -2,20 +2,32 @@
 # Author: Sanjeev Maharjan <me@sanjeev.au>
 
 import asyncio
-from typing import List, Dict, Any
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
 from pathlib import Path
 
+import aiofiles
+
 from core.config import Config
 from core.auth import RegistryAuthenticator
 from core.processor import ImageProcessor
 from utils.logger import Logger
 from utils.types import ValidationResult, MirrorResult
+from registries.base import DigestCache
 from registries.ecr import ECRRegistry
 from registries.gar import GARRegistry
 from registries.acr import ACRRegistry
 from registries.jfrog import JFrogRegistry
 from registries.docr import DOCRRegistry
 
+IMAGE_LIST_CHUNK_SIZE = 64 * 1024
+
+# DESTINATIONS SOURCE_IMAGE, separated by any run of whitespace
+IMAGE_LINE_RE = re.compile(r'(\S+)\s+(\S+)')
+# Sources carry their registry, e.g. docker.io/library/nginx:1.25
+SOURCE_RE = re.compile(r'[^/]+/\S+')
+VALID_DESTS = frozenset({'ECR', 'GAR', 'ACR', 'JFROG', 'DOCR'})
+
 
 class ContainerMirror:
   def __init__(self, config: Config, logger: Logger):
@@ -23,6 +35,7 @@ class ContainerMirror:
     self.logger = logger
     self.authenticator = RegistryAuthenticator(config, logger)
     self.processor = ImageProcessor(config, logger)
+    self.digest_cache: DigestCache = {}
     self.registries = self._initialize_registries()
 
   def _initialize_registries(self) -> Dict[str, Any]:
@@ -30,19 +43,19 @@ class ContainerMirror:
     registries = {}
 
     if self.config.ecr_regions:
-      registries['ECR'] = ECRRegistry(self.config, self.logger)
+      registries['ECR'] = ECRRegistry(self.config, self.logger, self.digest_cache)
 
     if self.config.gcp_regions:
-      registries['GAR'] = GARRegistry(self.config, self.logger)
+      registries['GAR'] = GARRegistry(self.config, self.logger, self.digest_cache)
 
     if self.config.azure_regions:
-      registries['ACR'] = ACRRegistry(self.config, self.logger)
+      registries['ACR'] = ACRRegistry(self.config, self.logger, self.digest_cache)
 
     if self.config.jfrog_url:
-      registries['JFROG'] = JFrogRegistry(self.config, self.logger)
+      registries['JFROG'] = JFrogRegistry(self.config, self.logger, self.digest_cache)
 
     if self.config.docr_token:
-      registries['DOCR'] = DOCRRegistry(self.config, self.logger)
+      registries['DOCR'] = DOCRRegistry(self.config, self.logger, self.digest_cache)
 
     return registries
 
@@ -97,13 +110,12 @@ class ContainerMirror:
     if not auth_result.success:
       raise RuntimeError(f"Authentication failed: {auth_result.message}")
 
-    # Load and parse image list
-    images = self._load_image_list()
-
-    self.logger.info(f"Total images to mirror: {len(images)}")
-
-    # Process images with parallel execution
-    results = await self.processor.process_images(images, self.registries)
+    # Process images with parallel execution, mirroring starts as soon as
+    # the first line of the image list is parsed
+    try:
+      results = await self.processor.process_images(self._iter_image_list(), self.registries)
+    finally:
+      await self.close()
 
     # Summary
     self.logger.info("")
@@ -120,38 +132,76 @@ class ContainerMirror:
 
     return results
 
-  def _load_image_list(self) -> List[Dict[str, str]]:
-    """Load and parse the image list file"""
-    images = []
+  async def close(self):
+    """Release resources held by the registry handlers"""
+    await asyncio.gather(*[registry.close() for registry in self.registries.values()])
+
+  async def _load_image_list(self) -> List[Dict[str, Any]]:
+    """Load and parse the whole image list file"""
+    return [image async for image in self._iter_image_list()]
 
-    with open(self.config.image_list_file, 'r') as f:
-      for line_num, line in enumerate(f, 1):
-        line = line.strip()
+  async def _iter_image_list(self) -> AsyncIterator[Dict[str, Any]]:
+    """Parse the image list file, yielding images as their lines are read"""
+    line_num = 0
 
-        # Skip comments and empty lines
-        if not line or line.startswith('#') or line.startswith('--'):
-          continue
+    async for raw in self._iter_lines():
+      line_num += 1
+      image = self._parse_image_line(line_num, raw)
+      if image is not None:
+        yield image
 
-        parts = line.split()
-        if len(parts) < 2:
-          self.logger.warning(f"Line {line_num}: Invalid format, skipping")
-          continue
+  async def _iter_lines(self) -> AsyncIterator[bytes]:
+    """Read the image list in fixed-size chunks and yield its lines"""
+    pending = b''
 
-        dest = parts[0]
-        source = parts[1]
+    async with aiofiles.open(self.config.image_list_file, 'rb') as f:
+      while True:
+        chunk = await f.read(IMAGE_LIST_CHUNK_SIZE)
+        if not chunk:
+          break
 
-        # Validate destination
-        valid_targets = ['ECR', 'GAR', 'ACR', 'JFROG', 'DOCR']
-        dest_targets = [d.strip() for d in dest.split(',')]
+        # The last piece may be a partial line, carry it into the next chunk
+        *lines, pending = (pending + chunk).split(b'\n')
+        for raw in lines:
+          yield raw
 
-        if not any(target in valid_targets for target in dest_targets):
-          self.logger.warning(f"Line {line_num}: Invalid destination '{dest}', skipping")
-          continue
+    if pending:
+      yield pending
 
-        images.append({
-          'destinations': dest_targets,
-          'source': source,
-          'line_number': line_num
-        })
+  def _parse_image_line(self, line_num: int, raw: bytes) -> Optional[Dict[str, Any]]:
+    """Parse one image list line, None if it is blank, a comment or invalid"""
+    raw = raw.strip()
 
-    return images
+    # Skip comments and empty lines
+    if not raw or raw[:1] == b'#' or raw[:2] == b'--':
+      return None
+
+    try:
+      line = raw.decode('utf-8')
+    except UnicodeDecodeError:
+      self.logger.warning(f"Line {line_num}: Invalid encoding, skipping")
+      return None
+
+    match = IMAGE_LINE_RE.match(line)
+    if match is None:
+      self.logger.warning(f"Line {line_num}: Invalid format, skipping")
+      return None
+
+    dest, source = match.groups()
+
+    # Validate destination
+    dest_targets = dest.split(',')
+
+    if not VALID_DESTS.issuperset(dest_targets):
+      self.logger.warning(f"Line {line_num}: Invalid destination '{dest}', skipping")
+      return None
+
+    if not SOURCE_RE.match(source):
+      self.logger.warning(f"Line {line_num}: Source '{source}' lacks a registry, skipping")
+      return None
+
+    return {
+      'destinations': dest_targets,
+      'source': source,
+      'line_number': line_num
+    }
@@ -2,15 +2,16 @@
 # Author: Sanjeev Maharjan <me@sanjeev.au>
 
 import asyncio
-from typing import List, Dict, Any
+import random
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Union
 from dataclasses import dataclass
 
 from core.config import Config
 from utils.logger import Logger
-from utils.types import MirrorResult
+from utils.types import SLOTS, MirrorResult
 
 
-@dataclass
+@dataclass(**SLOTS)
 class ImageTask:
   destinations: List[str]
   source: str
@@ -21,36 +22,63 @@ class ImageProcessor:
   def __init__(self, config: Config, logger: Logger):
     self.config = config
     self.logger = logger
-    self.semaphore = asyncio.Semaphore(config.max_parallel_jobs)
 
-  async def process_images(self, images: List[Dict[str, Any]],
+  async def process_images(self,
+                          images: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
                           registries: Dict[str, Any]) -> MirrorResult:
-    """Process all images with parallel execution and retry logic"""
-
-    tasks = [
-      ImageTask(
-        destinations=img['destinations'],
-        source=img['source'],
-        line_number=img['line_number']
-      )
-      for img in images
-    ]
-
-    # Create coroutines for all images
-    coroutines = [
-      self._process_single_image(task, registries)
-      for task in tasks
-    ]
-
-    # Execute with semaphore limiting
-    results = await asyncio.gather(*coroutines, return_exceptions=True)
+    """Process all images with parallel execution and retry logic
+
+    images may be an async iterable, workers start on the first image while
+    the rest are still being produced.
+    """
+    jobs = self.config.max_parallel_jobs
+
+    # Fixed pool of workers pulling from a bounded queue caps both concurrency
+    # and how far parsing runs ahead of mirroring
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * jobs)
+    results: List[bool] = []
+    total_images = 0
+
+    async def produce():
+      nonlocal total_images
+      async for img in _iterate(images):
+        await queue.put(ImageTask(
+          destinations=img['destinations'],
+          source=img['source'],
+          line_number=img['line_number']
+        ))
+        total_images += 1
+
+      # One stop marker per worker
+      for _ in range(jobs):
+        await queue.put(None)
+
+    async def worker():
+      while True:
+        task = await queue.get()
+        if task is None:
+          return
+
+        results.append(await self._process_single_image(task, registries))
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(jobs)]
+    try:
+      await produce()
+    except BaseException:
+      # Don't keep mirroring the queued images of a run that is already failing
+      for worker_task in workers:
+        worker_task.cancel()
+      await asyncio.gather(*workers, return_exceptions=True)
+      raise
+
+    await asyncio.gather(*workers)
 
     # Count results
     successful_images = sum(1 for r in results if r is True)
-    failed_images = sum(1 for r in results if r is not True)
+    failed_images = total_images - successful_images
 
     return MirrorResult(
-      total_images=len(images),
+      total_images=total_images,
       successful_images=successful_images,
       failed_images=failed_images
     )
@@ -58,39 +86,61 @@ class ImageProcessor:
   async def _process_single_image(self, task: ImageTask,
                                  registries: Dict[str, Any]) -> bool:
     """Process a single image with retry logic"""
-    async with self.semaphore:
-      for attempt in range(1, self.config.max_retries + 1):
-        try:
-          self.logger.debug(f"Attempt {attempt}/{self.config.max_retries} for {task.source}")
-
-          success = True
-          for destination in task.destinations:
-            destination = destination.strip()
-
-            if destination not in registries:
-              self.logger.error(f"Unknown destination: {destination}")
-              success = False
-              continue
-
-            registry = registries[destination]
-            if not await registry.push_image(task.source):
-              success = False
-
-          if success:
-            self.logger.success(f"Mirrored: {task.source}")
-            return True
-          else:
-            if attempt < self.config.max_retries:
-              self.logger.warning(
-                f"Attempt {attempt} failed for {task.source}, "
-                f"retrying in {self.config.retry_delay}s..."
-              )
-              await asyncio.sleep(self.config.retry_delay)
-
-        except Exception as e:
-          self.logger.error(f"Error processing {task.source}: {e}")
+    for attempt in range(1, self.config.max_retries + 1):
+      try:
+        self.logger.debug(f"Attempt {attempt}/{self.config.max_retries} for {task.source}")
+
+        success = True
+        pushes = []
+        for destination in task.destinations:
+          destination = destination.strip()
+
+          if destination not in registries:
+            self.logger.error(f"Unknown destination: {destination}")
+            success = False
+            continue
+
+          pushes.append(registries[destination].push_image(task.source))
+
+        # Destinations are independent, push to all of them at once
+        results = await asyncio.gather(*pushes, return_exceptions=True)
+        for result in results:
+          if isinstance(result, Exception):
+            self.logger.error(f"Error processing {task.source}: {result}")
+          if result is not True:
+            success = False
+
+        if success:
+          self.logger.success(f"Mirrored: {task.source}")
+          return True
+        else:
           if attempt < self.config.max_retries:
-            await asyncio.sleep(self.config.retry_delay)
-
-      self.logger.error(f"Failed to mirror after {self.config.max_retries} attempts: {task.source}")
-      return False
+            delay = self._retry_delay(attempt)
+            self.logger.warning(
+              f"Attempt {attempt} failed for {task.source}, "
+              f"retrying in {delay:.1f}s..."
+            )
+            await asyncio.sleep(delay)
+
+      except Exception as e:
+        self.logger.error(f"Error processing {task.source}: {e}")
+        if attempt < self.config.max_retries:
+          await asyncio.sleep(self._retry_delay(attempt))
+
+    self.logger.error(f"Failed to mirror after {self.config.max_retries} attempts: {task.source}")
+    return False
+
+  def _retry_delay(self, attempt: int) -> float:
+    """Exponential backoff with jitter so throttled workers don't retry in lockstep"""
+    backoff = min(self.config.retry_backoff_cap, self.config.retry_delay * 2 ** (attempt - 1))
+    return backoff * random.uniform(0.5, 1.5)
+
+
+async def _iterate(images: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+  """Iterate a plain or async iterable from a coroutine"""
+  if hasattr(images, '__aiter__'):
+    async for image in images:
+      yield image
+  else:
+    for image in images:
+      yield image
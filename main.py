@@ -6,6 +6,11 @@ from pathlib import Path
 
 import click
 
+try:
+  import uvloop
+except ImportError:
+  uvloop = None
+
 from core.mirror import ContainerMirror
 from core.config import ConfigManager
 from utils.logger import Logger
@@ -35,6 +40,10 @@ def main(image_list_file, max_parallel_jobs, max_retries, target_platform, debug
   """Multi-cloud container image mirroring tool"""
 
   logger = Logger(debug=debug_mode)
+
+  # uvloop is optional, it speeds up the subprocess-heavy event loop
+  if uvloop is not None:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
   logger.info("🚀 Multi-Cloud Container Mirror")
   logger.info("===============================")
 
@@ -1,31 +1,89 @@
 # registries/acr.py
 # Author: Sanjeev Maharjan <me@sanjeev.au>
 
-from registries.base import BaseRegistry
+import asyncio
+from typing import Dict, Optional, Set
+
+from core.config import Config
+from registries.base import BaseRegistry, DigestCache
+from utils.logger import Logger
 from utils.types import ValidationResult
 
 
 class ACRRegistry(BaseRegistry):
+  def __init__(self, config: Config, logger: Logger,
+               digest_cache: Optional[DigestCache] = None):
+    super().__init__(config, logger, digest_cache)
+    self._ensured_acrs: Set[str] = set()
+    self._acr_locks: Dict[str, asyncio.Lock] = {}
+    self._logged_in: Set[str] = set()
+    self._login_lock: Optional[asyncio.Lock] = None
+
+    # Region-derived names don't change between images, resolve them once
+    self._region_acrs = {
+      region: (self.config.azure_acr_name or
+               f"{self.config.azure_acr_name_prefix or 'org'}acr{region}")
+      for region in (self.config.azure_regions or [])
+    }
+    self._region_urls = {
+      region: f"{acr_name}.azurecr.io" for region, acr_name in self._region_acrs.items()
+    }
+
+  def _rate_limit(self) -> int:
+    """Max copies started per second to ACR"""
+    return self.config.acr_qps
+
   async def push_image(self, source: str) -> bool:
     """Push image to Azure Container Registry"""
+    return await self._push_regions(
+      self.config.azure_regions,
+      lambda region: self._push_region(source, region)
+    )
+
+  async def _push_region(self, source: str, region: str) -> bool:
+    """Mirror image to the ACR of a single region"""
     repo, tag = self._parse_image(source)
 
-    success_count = 0
-    total_regions = len(self.config.azure_regions)
+    acr_name = self._region_acrs[region]
+    target = f"{self._region_urls[region]}/{repo}:{tag}"
+
+    self.logger.debug(f"Mirroring {source} to ACR: {target}")
+
+    if not await self._ensure_acr(acr_name, region):
+      return False
+
+    if not await self._login(acr_name):
+      return False
+
+    if not await self._needs_copy(source, target):
+      self.logger.debug(f"Already up to date in ACR: {target}")
+      return True
+
+    # Copy image
+    success, stdout, stderr = await self._copy_image(source, target)
 
-    for region in self.config.azure_regions:
-      acr_name = (self.config.azure_acr_name or
-                  f"{self.config.azure_acr_name_prefix or 'org'}acr{region}")
-      acr_url = f"{acr_name}.azurecr.io"
-      target = f"{acr_url}/{repo}:{tag}"
+    if success:
+      self.logger.debug(f"✅ Successfully mirrored to ACR: {target}")
+      return True
 
-      self.logger.debug(f"Mirroring {source} to ACR: {target}")
+    self.logger.error(f"❌ Failed to mirror to ACR: {target} - {stderr}")
+    return False
+
+  async def _ensure_acr(self, acr_name: str, region: str) -> bool:
+    """Create the ACR if it doesn't exist, checked once per run"""
+    if acr_name in self._ensured_acrs:
+      return True
+
+    # Concurrent pushes to the same ACR wait for the first check
+    async with self._acr_locks.setdefault(acr_name, asyncio.Lock()):
+      if acr_name in self._ensured_acrs:
+        return True
 
-      # Create ACR if it doesn't exist
       success, stdout, stderr = await self._run_command(
         'az', 'acr', 'show',
         '--name', acr_name,
-        '--resource-group', self.config.azure_resource_group
+        '--resource-group', self.config.azure_resource_group,
+        capture=False
       )
 
       if not success:
@@ -36,34 +94,41 @@ class ACRRegistry(BaseRegistry):
           '--resource-group', self.config.azure_resource_group,
           '--location', region,
           '--sku', 'Standard',
-          '--admin-enabled', 'false'
+          '--admin-enabled', 'false',
+          capture=False
         )
 
         if not success:
           self.logger.error(f"Failed to create ACR: {stderr}")
-          continue
+          return False
+
+      self._ensured_acrs.add(acr_name)
+      return True
+
+  async def _login(self, acr_name: str) -> bool:
+    """Log in to the ACR, once per run since tokens outlive a mirror run"""
+    if acr_name in self._logged_in:
+      return True
+
+    # az acr login rewrites the docker config, so logins never overlap
+    if self._login_lock is None:
+      self._login_lock = asyncio.Lock()
+
+    async with self._login_lock:
+      if acr_name in self._logged_in:
+        return True
 
-      # Login to ACR
       success, stdout, stderr = await self._run_command(
-        'az', 'acr', 'login', '--name', acr_name
+        'az', 'acr', 'login', '--name', acr_name,
+        capture=False
       )
 
       if not success:
         self.logger.error(f"Failed to login to ACR: {stderr}")
-        continue
-
-      # Copy image
-      success, stdout, stderr = await self._run_crane_command(
-        'copy', source, target, '--platform', self.config.target_platform
-      )
-
-      if success:
-        self.logger.debug(f"✅ Successfully mirrored to ACR: {target}")
-        success_count += 1
-      else:
-        self.logger.error(f"❌ Failed to mirror to ACR: {target} - {stderr}")
+        return False
 
-    return success_count == total_regions
+      self._logged_in.add(acr_name)
+      return True
 
   async def validate_access(self) -> ValidationResult:
     """Validate ACR access"""
@@ -75,7 +140,8 @@ class ACRRegistry(BaseRegistry):
 
     # Check if resource group exists
     success, stdout, stderr = await self._run_command(
-      'az', 'group', 'show', '--name', self.config.azure_resource_group
+      'az', 'group', 'show', '--name', self.config.azure_resource_group,
+      capture=False
     )
 
     if not success:
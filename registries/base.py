@@ -3,71 +3,149 @@
 
 from abc import ABC, abstractmethod
 import asyncio
-import re
-from typing import Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from asyncio_throttle import Throttler
 
 from core.config import Config
+from registries.crane_pool import CranePool, job_from_args
 from utils.logger import Logger
+from utils.process import run_command, stream_command
 from utils.types import ValidationResult
 
+# Source image -> in-flight or finished digest lookup, shared by all registries
+DigestCache = Dict[str, 'asyncio.Future[Optional[str]]']
+
 
 class BaseRegistry(ABC):
-  def __init__(self, config: Config, logger: Logger):
+  # Upper bound on concurrent per-region pushes for a single image
+  MAX_REGION_FANOUT = 8
+
+  def __init__(self, config: Config, logger: Logger,
+               digest_cache: Optional[DigestCache] = None):
     self.config = config
     self.logger = logger
+    # Source digests, shared between registries so each source is resolved once
+    self._source_digest_cache = digest_cache if digest_cache is not None else {}
+    self.crane_pool = CranePool(logger, config.max_parallel_jobs)
+    # Provider APIs penalise bursts with long back-offs, cap copies per second
+    self._throttler = Throttler(rate_limit=self._rate_limit(), period=1.0)
+    self._subprocess_semaphore: Optional[asyncio.Semaphore] = None
+
+  def _rate_limit(self) -> int:
+    """Max copies started per second - override per provider"""
+    return 10
 
   def _parse_image(self, source: str) -> Tuple[str, str]:
     """Parse repository and tag from source image"""
-    match = re.match(r'^[^/]*/(.+):(.+)$', source)
-    if match:
-      return match.group(1), match.group(2)
-
-    # Fallback parsing
-    if ':' in source:
-      parts = source.split(':')
-      tag = parts[-1]
-      repo = ':'.join(parts[:-1])
-      if '/' in repo:
-        repo = '/'.join(repo.split('/')[1:])
-      return repo, tag
-
-    return source, 'latest'
-
-  async def _run_crane_command(self, *args) -> Tuple[bool, str, str]:
-    """Run crane command and return success, stdout, stderr"""
-    try:
-      proc = await asyncio.create_subprocess_exec(
-        'crane', *args,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-      )
-      stdout, stderr = await proc.communicate()
+    # Drop the registry host, then split the tag off the last ':'
+    rest = source.split('/', 1)[1] if '/' in source else source
 
-      return (
-        proc.returncode == 0,
-        stdout.decode().strip(),
-        stderr.decode().strip()
-      )
-    except Exception as e:
-      return False, '', str(e)
+    repo, sep, tag = rest.rpartition(':')
+    if not sep:
+      return rest, 'latest'
+
+    return repo, tag
 
-  async def _run_command(self, *args) -> Tuple[bool, str, str]:
+  async def _run_crane_command(self, *args, capture: bool = True,
+                               stream: bool = False) -> Tuple[bool, str, str]:
+    """Run crane command and return success, stdout, stderr
+
+    With stream=True stdout is discarded and stderr is forwarded to the debug
+    log as it arrives, keeping only its tail for the error message.
+    """
+    # Prefer a warm crane-daemon worker over exec'ing crane per call
+    job = job_from_args(args)
+    if job is not None and self.crane_pool.available:
+      return await self.crane_pool.execute(job)
+
+    async with self._subprocess_slot():
+      if stream:
+        return await stream_command(
+          'crane', *args,
+          on_line=lambda line: self.logger.debug(f"crane: {line}")
+        )
+
+      return await run_command('crane', *args, capture=capture)
+
+  async def _run_command(self, *args, capture: bool = True) -> Tuple[bool, str, str]:
     """Run generic command and return success, stdout, stderr"""
-    try:
-      proc = await asyncio.create_subprocess_exec(
-        *args,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-      )
-      stdout, stderr = await proc.communicate()
+    async with self._subprocess_slot():
+      return await run_command(*args, capture=capture)
+
+  def _subprocess_slot(self) -> asyncio.Semaphore:
+    """Semaphore capping this registry's concurrent child processes"""
+    # Region fan-out multiplies with the image workers, without a cap a
+    # run can fork dozens of aws/gcloud/crane processes at once
+    if self._subprocess_semaphore is None:
+      self._subprocess_semaphore = asyncio.Semaphore(self.config.max_parallel_jobs)
+    return self._subprocess_semaphore
 
-      return (
-        proc.returncode == 0,
-        stdout.decode().strip(),
-        stderr.decode().strip()
+  async def _push_regions(self, regions: List[str],
+                          push_region: Callable[[str], Awaitable[bool]]) -> bool:
+    """Run push_region for every region concurrently, True if all succeed"""
+    # Bound the per-image fan-out, the processor workers cap images globally
+    semaphore = asyncio.Semaphore(min(len(regions), self.MAX_REGION_FANOUT))
+
+    async def push_bounded(region: str) -> bool:
+      async with semaphore:
+        return await push_region(region)
+
+    results = await asyncio.gather(
+      *[push_bounded(region) for region in regions],
+      return_exceptions=True
+    )
+
+    return sum(1 for r in results if r is True) == len(regions)
+
+  async def _copy_image(self, source: str, target: str) -> Tuple[bool, str, str]:
+    """Copy source to target, rate limited per registry"""
+    async with self._throttler:
+      return await self._run_crane_command(
+        'copy', source, target, '--platform', self.config.target_platform,
+        stream=True
       )
-    except Exception as e:
-      return False, '', str(e)
+
+  async def _source_digest(self, source: str) -> Optional[str]:
+    """Resolve the platform digest of a source image, cached across registries"""
+    # Cache the lookup itself so the regions and registries that all reach
+    # a new source at once share one crane digest call
+    lookup = self._source_digest_cache.get(source)
+    if lookup is None:
+      lookup = asyncio.ensure_future(self._resolve_digest(source))
+      self._source_digest_cache[source] = lookup
+
+    # Shielded so one cancelled waiter doesn't cancel the lookup for the rest
+    digest = await asyncio.shield(lookup)
+
+    if digest is None and self._source_digest_cache.get(source) is lookup:
+      # Let a retry resolve it again
+      del self._source_digest_cache[source]
+
+    return digest
+
+  async def _resolve_digest(self, source: str) -> Optional[str]:
+    """Look up the platform digest of a source image"""
+    success, digest, stderr = await self._run_crane_command(
+      'digest', source, '--platform', self.config.target_platform
+    )
+    if not success:
+      self.logger.debug(f"Could not resolve digest for {source}: {stderr}")
+      return None
+    return digest
+
+  async def _needs_copy(self, source: str, target: str) -> bool:
+    """Check whether target is missing or differs from source"""
+    source_digest, (success, target_digest, stderr) = await asyncio.gather(
+      self._source_digest(source),
+      self._run_crane_command('digest', target, '--platform', self.config.target_platform)
+    )
+
+    return not (source_digest and success and source_digest == target_digest)
+
+  async def close(self):
+    """Release resources held by the registry"""
+    await self.crane_pool.close()
 
   @abstractmethod
   async def push_image(self, source: str) -> bool:
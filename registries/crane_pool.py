@@ -0,0 +1,138 @@
+# registries/crane_pool.py
+# Author: Sanjeev Maharjan <me@sanjeev.au>
+
+import asyncio
+import itertools
+import json
+import shutil
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from utils.logger import Logger
+
+CRANE_DAEMON = 'crane-daemon'
+
+
+def job_from_args(args: Sequence[str]) -> Optional[Dict[str, Any]]:
+  """Translate crane CLI arguments into a crane-daemon job, if supported"""
+  if len(args) == 3 and args[0] == 'copy':
+    return {'op': 'copy', 'src': args[1], 'dst': args[2], 'platform': ''}
+
+  if len(args) == 5 and args[0] == 'copy' and args[3] == '--platform':
+    return {'op': 'copy', 'src': args[1], 'dst': args[2], 'platform': args[4]}
+
+  if len(args) == 2 and args[0] == 'digest':
+    return {'op': 'digest', 'src': args[1], 'dst': '', 'platform': ''}
+
+  if len(args) == 4 and args[0] == 'digest' and args[2] == '--platform':
+    return {'op': 'digest', 'src': args[1], 'dst': '', 'platform': args[3]}
+
+  return None
+
+
+class CranePool:
+  """Persistent crane-daemon running a registry's jobs concurrently
+
+  One process serves every job for its registry so copies share connections
+  and auth; up to max_pool_size jobs are in flight at once.
+  """
+
+  def __init__(self, logger: Logger, max_pool_size: int,
+               daemon_path: Optional[str] = None):
+    self.logger = logger
+    self.max_pool_size = max(1, max_pool_size)
+    self.daemon_path = daemon_path or shutil.which(CRANE_DAEMON)
+    self._proc: Optional[asyncio.subprocess.Process] = None
+    self._reader: Optional[asyncio.Future] = None
+    self._pending: Dict[int, asyncio.Future] = {}
+    # crane-daemon answers lines it cannot parse with the zero id, so no
+    # real job may use it
+    self._job_ids = itertools.count(1)
+    self._semaphore: Optional[asyncio.Semaphore] = None
+    self._start_lock: Optional[asyncio.Lock] = None
+
+  @property
+  def available(self) -> bool:
+    """Whether the crane-daemon helper is installed"""
+    return self.daemon_path is not None
+
+  async def _ensure_started(self) -> asyncio.subprocess.Process:
+    """Start the daemon on first use, or again if it exited"""
+    if self._start_lock is None:
+      self._start_lock = asyncio.Lock()
+
+    async with self._start_lock:
+      if self._proc is None:
+        self.logger.debug(f"Starting {CRANE_DAEMON}")
+        self._proc = await asyncio.create_subprocess_exec(
+          self.daemon_path,
+          stdin=asyncio.subprocess.PIPE,
+          stdout=asyncio.subprocess.PIPE,
+          stderr=asyncio.subprocess.DEVNULL
+        )
+        self._reader = asyncio.ensure_future(self._read_results(self._proc))
+
+      return self._proc
+
+  async def _read_results(self, proc: asyncio.subprocess.Process):
+    """Resolve pending jobs as their results arrive"""
+    try:
+      async for line in proc.stdout:
+        try:
+          result = json.loads(line)
+          job_id = result['id']
+        except (ValueError, TypeError, KeyError) as e:
+          self.logger.debug(f"Ignoring malformed {CRANE_DAEMON} output {line!r}: {e}")
+          continue
+
+        future = self._pending.pop(job_id, None)
+        if future is not None and not future.done():
+          future.set_result(result)
+    finally:
+      # Don't leave a daemon running that nothing reads from any more
+      if proc.returncode is None:
+        try:
+          proc.kill()
+        except ProcessLookupError:
+          pass
+
+      # The daemon is gone, fail whatever it was still working on
+      if self._proc is proc:
+        self._proc = None
+      for future in self._pending.values():
+        if not future.done():
+          future.set_exception(RuntimeError(f"{CRANE_DAEMON} exited unexpectedly"))
+      self._pending.clear()
+
+  async def execute(self, job: Dict[str, Any]) -> Tuple[bool, str, str]:
+    """Run a job on the daemon and return success, stdout, stderr"""
+    if self._semaphore is None:
+      self._semaphore = asyncio.Semaphore(self.max_pool_size)
+
+    async with self._semaphore:
+      job_id = next(self._job_ids)
+      try:
+        proc = await self._ensure_started()
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[job_id] = future
+
+        proc.stdin.write(json.dumps(dict(job, id=job_id)).encode() + b'\n')
+        await proc.stdin.drain()
+
+        result = await future
+      except Exception as e:
+        return False, '', str(e)
+      finally:
+        self._pending.pop(job_id, None)
+
+    return bool(result.get('ok')), result.get('output', ''), result.get('error', '')
+
+  async def close(self):
+    """Let the daemon finish in-flight jobs and exit"""
+    if self._proc is None:
+      return
+
+    proc, reader = self._proc, self._reader
+    proc.stdin.close()
+    await proc.wait()
+    await reader
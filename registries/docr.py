@@ -1,36 +1,47 @@
 # registries/docr.py
 # Author: Sanjeev Maharjan <me@sanjeev.au>
 
-from registries.base import BaseRegistry
+from typing import Optional
+
+from core.config import Config
+from registries.base import BaseRegistry, DigestCache
+from utils.logger import Logger
 from utils.types import ValidationResult
 
 
 class DOCRRegistry(BaseRegistry):
+  def __init__(self, config: Config, logger: Logger,
+               digest_cache: Optional[DigestCache] = None):
+    super().__init__(config, logger, digest_cache)
+
+    # DOCR has no regional endpoints, every region is this one registry
+    self._registry_url = f"registry.digitalocean.com/{self.config.docr_registry_name}"
+
+  def _rate_limit(self) -> int:
+    """Max copies started per second to DOCR"""
+    return self.config.docr_qps
+
   async def push_image(self, source: str) -> bool:
     """Push image to DigitalOcean Container Registry"""
     repo, tag = self._parse_image(source)
 
-    success_count = 0
-    total_regions = len(self.config.docr_regions or ['nyc3'])
+    target = f"{self._registry_url}/{repo}:{tag}"
 
-    for region in (self.config.docr_regions or ['nyc3']):
-      docr_url = f"registry.digitalocean.com/{self.config.docr_registry_name}"
-      target = f"{docr_url}/{repo}:{tag}"
+    self.logger.debug(f"Mirroring {source} to DOCR: {target}")
 
-      self.logger.debug(f"Mirroring {source} to DOCR: {target}")
+    if not await self._needs_copy(source, target):
+      self.logger.debug(f"Already up to date in DOCR: {target}")
+      return True
 
-      # Copy image
-      success, stdout, stderr = await self._run_crane_command(
-        'copy', source, target, '--platform', self.config.target_platform
-      )
+    # Copy image
+    success, stdout, stderr = await self._copy_image(source, target)
 
-      if success:
-        self.logger.debug(f"✅ Successfully mirrored to DOCR: {target}")
-        success_count += 1
-      else:
-        self.logger.error(f"❌ Failed to mirror to DOCR: {target} - {stderr}")
+    if success:
+      self.logger.debug(f"✅ Successfully mirrored to DOCR: {target}")
+      return True
 
-    return success_count == total_regions
+    self.logger.error(f"❌ Failed to mirror to DOCR: {target} - {stderr}")
+    return False
 
   async def validate_access(self) -> ValidationResult:
     """Validate DigitalOcean Container Registry access"""
@@ -1,80 +1,204 @@
 # registries/ecr.py
 # Author: Sanjeev Maharjan <me@sanjeev.au>
 
-from registries.base import BaseRegistry
+import asyncio
+import json
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+try:
+  import boto3
+except ImportError:
+  boto3 = None
+
+from core.config import Config
+from registries.base import BaseRegistry, DigestCache
+from utils.aio import validate_all
+from utils.logger import Logger
 from utils.types import ValidationResult
 
 
 class ECRRegistry(BaseRegistry):
+  def __init__(self, config: Config, logger: Logger,
+               digest_cache: Optional[DigestCache] = None):
+    super().__init__(config, logger, digest_cache)
+    self._account_id_lock: Optional[asyncio.Lock] = None
+    self._known_repos: Dict[str, Set[str]] = {}
+    self._repo_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+    self._warm_locks: Dict[str, asyncio.Lock] = {}
+    self._session = boto3.session.Session() if boto3 is not None else None
+    self._clients: Dict[Tuple[str, Optional[str]], Any] = {}
+
+  def _rate_limit(self) -> int:
+    """Max copies started per second to ECR"""
+    return self.config.ecr_qps
+
+  def _client(self, service: str, region: Optional[str] = None) -> Any:
+    """Cached boto3 client, one per service and region"""
+    # Created on the loop thread since sessions aren't thread-safe, the
+    # clients themselves are and keep their connection pools between calls
+    key = (service, region)
+    if key not in self._clients:
+      self._clients[key] = self._session.client(service, region_name=region)
+    return self._clients[key]
+
+  async def _aws(self, api_call: Callable[[], Any], *cli_args,
+                 capture: bool = True) -> Tuple[bool, str, str]:
+    """Run an AWS API call in-process with boto3, else through the aws CLI
+
+    Like the CLI path, only string results are passed back as stdout.
+    """
+    if self._session is None:
+      return await self._run_command('aws', *cli_args, capture=capture)
+
+    try:
+      loop = asyncio.get_running_loop()
+      result = await loop.run_in_executor(None, api_call)
+    except Exception as e:
+      return False, '', str(e)
+
+    return True, (result if isinstance(result, str) else ''), ''
+
   async def push_image(self, source: str) -> bool:
     """Push image to AWS ECR"""
+    account_id = await self._get_account_id()
+    if not account_id:
+      return False
+
+    return await self._push_regions(
+      self.config.ecr_regions,
+      lambda region: self._push_region(source, region, account_id)
+    )
+
+  async def _get_account_id(self) -> Optional[str]:
+    """Resolve the AWS account ID once, sharing it with the authenticator via config"""
+    if self._account_id_lock is None:
+      self._account_id_lock = asyncio.Lock()
+
+    # Concurrent first pushes would otherwise all resolve it
+    async with self._account_id_lock:
+      # Read at call time, authentication fills this in after construction
+      if not self.config.aws_account_id:
+        sts = self._client('sts') if self._session else None
+        success, stdout, stderr = await self._aws(
+          lambda: sts.get_caller_identity()['Account'],
+          'sts', 'get-caller-identity',
+          '--query', 'Account', '--output', 'text'
+        )
+
+        if not success:
+          self.logger.error(f"Failed to get AWS account ID: {stderr}")
+          return None
+
+        self.config.aws_account_id = stdout.strip()
+
+    return self.config.aws_account_id
+
+  async def _push_region(self, source: str, region: str, account_id: str) -> bool:
+    """Mirror image to ECR in a single region"""
     repo, tag = self._parse_image(source)
 
-    success_count = 0
-    total_regions = len(self.config.ecr_regions)
+    ecr_url = f"{account_id}.dkr.ecr.{region}.amazonaws.com"
+    target = f"{ecr_url}/{repo}:{tag}"
 
-    for region in self.config.ecr_regions:
-      # Get AWS account ID for this region
-      success, account_id, stderr = await self._run_command(
-        'aws', 'sts', 'get-caller-identity',
-        '--query', 'Account', '--output', 'text'
-      )
+    self.logger.debug(f"Mirroring {source} to ECR: {target}")
 
-      if not success:
-        self.logger.error(f"Failed to get AWS account ID: {stderr}")
-        continue
+    if not await self._ensure_repository(repo, region):
+      return False
+
+    if not await self._needs_copy(source, target):
+      self.logger.debug(f"Already up to date in ECR: {target}")
+      return True
+
+    # Copy image
+    success, stdout, stderr = await self._copy_image(source, target)
+
+    if success:
+      self.logger.debug(f"✅ Successfully mirrored to ECR: {target}")
+      return True
 
-      ecr_url = f"{account_id.strip()}.dkr.ecr.{region}.amazonaws.com"
-      target = f"{ecr_url}/{repo}:{tag}"
+    self.logger.error(f"❌ Failed to mirror to ECR: {target} - {stderr}")
+    return False
 
-      self.logger.debug(f"Mirroring {source} to ECR: {target}")
+  async def _ensure_repository(self, repo: str, region: str) -> bool:
+    """Create the ECR repository if it doesn't exist, checked once per run"""
+    if region not in self._known_repos:
+      async with self._warm_locks.setdefault(region, asyncio.Lock()):
+        if region not in self._known_repos:
+          await self._warm_repo_cache(region)
 
-      # Create repository if it doesn't exist
-      success, stdout, stderr = await self._run_command(
-        'aws', 'ecr', 'describe-repositories',
+    known = self._known_repos[region]
+    if repo in known:
+      return True
+
+    # Concurrent pushes to the same repository wait for the first check
+    async with self._repo_locks.setdefault((region, repo), asyncio.Lock()):
+      if repo in known:
+        return True
+
+      ecr = self._client('ecr', region) if self._session else None
+      success, stdout, stderr = await self._aws(
+        lambda: ecr.describe_repositories(repositoryNames=[repo]),
+        'ecr', 'describe-repositories',
         '--repository-name', repo,
-        '--region', region
+        '--region', region,
+        capture=False
       )
 
       if not success:
         self.logger.debug(f"Creating ECR repository: {repo}")
-        success, stdout, stderr = await self._run_command(
-          'aws', 'ecr', 'create-repository',
+        success, stdout, stderr = await self._aws(
+          lambda: ecr.create_repository(
+            repositoryName=repo,
+            imageScanningConfiguration={'scanOnPush': True}
+          ),
+          'ecr', 'create-repository',
           '--repository-name', repo,
           '--image-scanning-configuration', 'scanOnPush=true',
-          '--region', region
+          '--region', region,
+          capture=False
         )
 
         if not success:
           self.logger.error(f"Failed to create ECR repository: {stderr}")
-          continue
-
-      # Copy image
-      success, stdout, stderr = await self._run_crane_command(
-        'copy', source, target, '--platform', self.config.target_platform
+          return False
+
+      known.add(repo)
+      return True
+
+  async def _warm_repo_cache(self, region: str) -> ValidationResult:
+    """List every repository in a region once, seeding the known-repo cache"""
+    # Pushes fall back to describe-repositories if the listing fails
+    known = self._known_repos.setdefault(region, set())
+
+    ecr = self._client('ecr', region) if self._session else None
+    success, stdout, stderr = await self._aws(
+      lambda: json.dumps([
+        repository['repositoryName']
+        for page in ecr.get_paginator('describe_repositories').paginate()
+        for repository in page['repositories']
+      ]),
+      'ecr', 'describe-repositories',
+      '--region', region,
+      '--query', 'repositories[].repositoryName',
+      '--output', 'json'
+    )
+
+    if not success:
+      return ValidationResult(
+        success=False,
+        message=f"ECR access failed in {region}: {stderr}"
       )
 
-      if success:
-        self.logger.debug(f"✅ Successfully mirrored to ECR: {target}")
-        success_count += 1
-      else:
-        self.logger.error(f"❌ Failed to mirror to ECR: {target} - {stderr}")
+    try:
+      known.update(json.loads(stdout or '[]') or [])
+    except ValueError:
+      self.logger.debug(f"Unexpected describe-repositories output in {region}")
 
-    return success_count == total_regions
+    return ValidationResult(success=True)
 
   async def validate_access(self) -> ValidationResult:
     """Validate ECR access in all configured regions"""
-    for region in self.config.ecr_regions:
-      success, stdout, stderr = await self._run_command(
-        'aws', 'ecr', 'describe-repositories',
-        '--region', region,
-        '--max-items', '1'
-      )
-
-      if not success:
-        return ValidationResult(
-          success=False,
-          message=f"ECR access failed in {region}: {stderr}"
-        )
-
-    return ValidationResult(success=True)
+    # Any region failing fails validation, stop probing the rest
+    return await validate_all(
+      self._warm_repo_cache(region) for region in self.config.ecr_regions
+    )
@@ -1,56 +1,96 @@
 # registries/gar.py
 # Author: Sanjeev Maharjan <me@sanjeev.au>
 
-from registries.base import BaseRegistry
+import asyncio
+from typing import Dict, Optional, Set, Tuple
+
+from core.config import Config
+from registries.base import BaseRegistry, DigestCache
+from utils.aio import validate_all
+from utils.logger import Logger
 from utils.types import ValidationResult
 
+GAR_REPOSITORY = 'k8s-assets'
+
 
 class GARRegistry(BaseRegistry):
+  def __init__(self, config: Config, logger: Logger,
+               digest_cache: Optional[DigestCache] = None):
+    super().__init__(config, logger, digest_cache)
+    self._known_repos: Set[Tuple[str, str]] = set()
+    self._repo_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+  def _rate_limit(self) -> int:
+    """Max copies started per second to GAR"""
+    return self.config.gar_qps
+
   async def push_image(self, source: str) -> bool:
     """Push image to Google Artifact Registry"""
+    return await self._push_regions(
+      self.config.gcp_regions,
+      lambda region: self._push_region(source, region)
+    )
+
+  async def _push_region(self, source: str, region: str) -> bool:
+    """Mirror image to GAR in a single region"""
     repo, tag = self._parse_image(source)
 
-    success_count = 0
-    total_regions = len(self.config.gcp_regions)
+    gar_url = f"{region}-docker.pkg.dev/{self.config.gcp_project_id}/{GAR_REPOSITORY}"
+    target = f"{gar_url}/{repo}:{tag}"
+
+    self.logger.debug(f"Mirroring {source} to GAR: {target}")
+
+    if not await self._ensure_repository(region):
+      return False
+
+    if not await self._needs_copy(source, target):
+      self.logger.debug(f"Already up to date in GAR: {target}")
+      return True
+
+    # Copy image
+    success, stdout, stderr = await self._copy_image(source, target)
+
+    if success:
+      self.logger.debug(f"✅ Successfully mirrored to GAR: {target}")
+      return True
+
+    self.logger.error(f"❌ Failed to mirror to GAR: {target} - {stderr}")
+    return False
 
-    for region in self.config.gcp_regions:
-      gar_url = f"{region}-docker.pkg.dev/{self.config.gcp_project_id}/k8s-assets"
-      target = f"{gar_url}/{repo}:{tag}"
+  async def _ensure_repository(self, region: str) -> bool:
+    """Create the k8s-assets repository if it doesn't exist, checked once per run"""
+    key = (region, self.config.gcp_project_id)
+    if key in self._known_repos:
+      return True
 
-      self.logger.debug(f"Mirroring {source} to GAR: {target}")
+    # Concurrent pushes to the same region wait for the first check
+    async with self._repo_locks.setdefault(key, asyncio.Lock()):
+      if key in self._known_repos:
+        return True
 
-      # Create repository if it doesn't exist
       success, stdout, stderr = await self._run_command(
-        'gcloud', 'artifacts', 'repositories', 'describe', 'k8s-assets',
+        'gcloud', 'artifacts', 'repositories', 'describe', GAR_REPOSITORY,
         '--location', region,
-        '--project', self.config.gcp_project_id
+        '--project', self.config.gcp_project_id,
+        capture=False
       )
 
       if not success:
-        self.logger.debug(f"Creating GAR repository: k8s-assets in {region}")
+        self.logger.debug(f"Creating GAR repository: {GAR_REPOSITORY} in {region}")
         success, stdout, stderr = await self._run_command(
-          'gcloud', 'artifacts', 'repositories', 'create', 'k8s-assets',
+          'gcloud', 'artifacts', 'repositories', 'create', GAR_REPOSITORY,
           '--repository-format', 'docker',
           '--location', region,
-          '--project', self.config.gcp_project_id
+          '--project', self.config.gcp_project_id,
+          capture=False
         )
 
         if not success:
           self.logger.error(f"Failed to create GAR repository: {stderr}")
-          continue
+          return False
 
-      # Copy image
-      success, stdout, stderr = await self._run_crane_command(
-        'copy', source, target, '--platform', self.config.target_platform
-      )
-
-      if success:
-        self.logger.debug(f"✅ Successfully mirrored to GAR: {target}")
-        success_count += 1
-      else:
-        self.logger.error(f"❌ Failed to mirror to GAR: {target} - {stderr}")
-
-    return success_count == total_regions
+      self._known_repos.add(key)
+      return True
 
   async def validate_access(self) -> ValidationResult:
     """Validate GAR access in all configured regions"""
@@ -60,15 +100,22 @@ class GARRegistry(BaseRegistry):
         message="GCP_PROJECT_ID not configured"
       )
 
-    for region in self.config.gcp_regions:
-      success, stdout, stderr = await self._run_command(
-        'gcloud', 'artifacts', 'locations', 'describe', region
-      )
+    # Any region failing fails validation, stop probing the rest
+    return await validate_all(
+      self._validate_region(region) for region in self.config.gcp_regions
+    )
 
-      if not success:
-        return ValidationResult(
-          success=False,
-          message=f"GAR access failed in {region}: {stderr}"
-        )
+  async def _validate_region(self, region: str) -> ValidationResult:
+    """Validate GAR access in a single region"""
+    success, stdout, stderr = await self._run_command(
+      'gcloud', 'artifacts', 'locations', 'describe', region,
+      capture=False
+    )
+
+    if not success:
+      return ValidationResult(
+        success=False,
+        message=f"GAR access failed in {region}: {stderr}"
+      )
 
     return ValidationResult(success=True)
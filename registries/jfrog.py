@@ -1,24 +1,52 @@
 # registries/jfrog.py
 # Author: Sanjeev Maharjan <me@sanjeev.au>
 
-from registries.base import BaseRegistry
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+
+from core.config import Config
+from registries.base import BaseRegistry, DigestCache
+from utils.logger import Logger
 from utils.types import ValidationResult
 
 
+def parse_jfrog_url(jfrog_url: str) -> Tuple[str, str]:
+  """Split JFROG_URL into its host[:port] and path, with or without a scheme"""
+  # Without '//' urlparse reads 'jfrog.local:8082' as scheme 'jfrog.local'
+  parsed = urlparse(jfrog_url if '://' in jfrog_url else f"//{jfrog_url}")
+  return parsed.netloc, parsed.path.rstrip('/')
+
+
 class JFrogRegistry(BaseRegistry):
+  def __init__(self, config: Config, logger: Logger,
+               digest_cache: Optional[DigestCache] = None):
+    super().__init__(config, logger, digest_cache)
+
+    # crane wants a registry reference, not a URL, so drop the scheme
+    jfrog_host, jfrog_path = parse_jfrog_url(self.config.jfrog_url or '')
+    self._registry_url = (
+      f"{jfrog_host}{jfrog_path}"
+      f"/artifactory/{self.config.jfrog_repository or 'docker-local'}"
+    )
+
+  def _rate_limit(self) -> int:
+    """Max copies started per second to JFrog"""
+    return self.config.jfrog_qps
+
   async def push_image(self, source: str) -> bool:
     """Push image to JFrog Artifactory"""
     repo, tag = self._parse_image(source)
 
-    jfrog_docker_url = f"{self.config.jfrog_url}/artifactory/{self.config.jfrog_repository or 'docker-local'}"
-    target = f"{jfrog_docker_url}/{repo}:{tag}"
+    target = f"{self._registry_url}/{repo}:{tag}"
 
     self.logger.debug(f"Mirroring {source} to JFrog: {target}")
 
+    if not await self._needs_copy(source, target):
+      self.logger.debug(f"Already up to date in JFrog: {target}")
+      return True
+
     # Copy image
-    success, stdout, stderr = await self._run_crane_command(
-      'copy', source, target, '--platform', self.config.target_platform
-    )
+    success, stdout, stderr = await self._copy_image(source, target)
 
     if success:
       self.logger.debug(f"✅ Successfully mirrored to JFrog: {target}")
@@ -36,8 +64,6 @@ class JFrogRegistry(BaseRegistry):
       )
 
     # Test authentication by trying to list repositories
-    jfrog_host = self.config.jfrog_url.replace('https://', '').replace('http://', '').split('/')[0]
-
     success, stdout, stderr = await self._run_crane_command('auth', 'login', 'test')
 
     return ValidationResult(success=True)
@@ -3,25 +3,37 @@
 # Author: Sanjeev Maharjan <me@sanjeev.au>
 
 import asyncio
+import hashlib
+import json
 import os
 import platform
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+import urllib.parse
 import urllib.request
 from pathlib import Path
+from typing import Callable, Dict, Optional
+
+CACHE_DIR = Path.home() / '.cache' / 'multi-cloud-mirror'
+DOWNLOAD_CACHE = CACHE_DIR / 'downloads.json'
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
 
 class CloudMirrorSetup:
   def __init__(self):
-    self.system = platform.system().lower()
-    self.arch = self._get_arch()
+    uname = platform.uname()
+    self.system = uname.system.lower()
+    self.arch = self._get_arch(uname.machine)
     self.script_dir = Path(__file__).parent.parent
+    self._download_cache_lock = threading.Lock()
+    self._releases: Dict[str, str] = {}
 
-  def _get_arch(self) -> str:
+  def _get_arch(self, machine: str) -> str:
     """Get normalized architecture"""
-    arch = platform.machine().lower()
+    arch = machine.lower()
     if arch in ('x86_64', 'amd64'):
       return 'amd64'
     elif arch in ('aarch64', 'arm64'):
@@ -33,10 +45,11 @@ class CloudMirrorSetup:
     if os.geteuid() == 0:
       print("⚠️  Warning: Running as root. Consider using a non-root user.")
 
-  def _run_command(self, cmd: list, check: bool = True) -> subprocess.CompletedProcess:
+  def _run_command(self, cmd: list, check: bool = True,
+                   input: Optional[str] = None) -> subprocess.CompletedProcess:
     """Run shell command"""
     try:
-      return subprocess.run(cmd, check=check, capture_output=True, text=True)
+      return subprocess.run(cmd, check=check, capture_output=True, text=True, input=input)
     except subprocess.CalledProcessError as e:
       print(f"❌ Command failed: {' '.join(cmd)}")
       print(f"   Error: {e.stderr}")
@@ -44,10 +57,93 @@ class CloudMirrorSetup:
         sys.exit(1)
       return e
 
+  def _fetch(self, url: str) -> bytes:
+    """Fetch a small resource such as an install script into memory"""
+    with urllib.request.urlopen(url) as response:
+      return response.read()
+
+  def _latest_release(self, repo: str) -> str:
+    """Get the tag of a GitHub repository's latest release"""
+    if repo not in self._releases:
+      url = f"https://api.github.com/repos/{repo}/releases/latest"
+      with urllib.request.urlopen(url) as response:
+        self._releases[repo] = json.load(response)['tag_name']
+    return self._releases[repo]
+
+  def _crane_url(self) -> str:
+    """Release archive URL for crane"""
+    version = self._latest_release('google/go-containerregistry')
+    archive_name = f"go-containerregistry_{self.system}_{self.arch}.tar.gz"
+    return f"https://github.com/google/go-containerregistry/releases/download/{version}/{archive_name}"
+
+  def _aws_cli_url(self) -> Optional[str]:
+    """Installer URL for the AWS CLI, None on unsupported systems"""
+    if self.system == 'linux':
+      return 'https://awscli.amazonaws.com/awscli-exe-linux-x86_64.zip'
+    if self.system == 'darwin':
+      return 'https://awscli.amazonaws.com/AWSCLIV2.pkg'
+    return None
+
+  def _doctl_url(self) -> str:
+    """Release archive URL for doctl"""
+    version = self._latest_release('digitalocean/doctl')
+    archive_name = f"doctl-{version.lstrip('v')}-{self.system}-{self.arch}.tar.gz"
+    return f"https://github.com/digitalocean/doctl/releases/download/{version}/{archive_name}"
+
+  def _load_download_cache(self) -> dict:
+    """Load the url -> etag, size, path map of earlier downloads"""
+    try:
+      return json.loads(DOWNLOAD_CACHE.read_text())
+    except (OSError, ValueError):
+      return {}
+
   def _download_file(self, url: str, target_path: Path):
-    """Download file from URL"""
-    print(f"Downloading {url}...")
-    urllib.request.urlretrieve(url, target_path)
+    """Download file from URL, reusing the cached copy if it is unchanged"""
+    shutil.copyfile(self._cache_download(url), target_path)
+
+  def _prefetch(self, url_for: Callable[[], Optional[str]]):
+    """Download an installer into the cache ahead of installing it"""
+    # Errors surface again, with the usual handling, when the installer runs
+    try:
+      url = url_for()
+      if url:
+        self._cache_download(url)
+    except Exception as e:
+      print(f"⚠️  Prefetch failed, will retry during install: {e}")
+
+  def _cache_download(self, url: str) -> Path:
+    """Fetch URL into the download cache unless the cached copy is current"""
+    url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
+    cached_path = CACHE_DIR / f"{url_hash}-{Path(urllib.parse.urlparse(url).path).name}"
+
+    with urllib.request.urlopen(url) as response:
+      etag = response.headers.get('ETag')
+      size = int(response.headers.get('Content-Length') or -1)
+
+      with self._download_cache_lock:
+        entry = self._load_download_cache().get(url)
+
+      fresh = (
+        entry is not None and entry['etag'] == etag and entry['size'] == size and
+        cached_path.exists() and cached_path.stat().st_size == size
+      )
+
+      if fresh:
+        print(f"Using cached {url}")
+      else:
+        print(f"Downloading {url}...")
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(cached_path, 'wb') as f:
+          shutil.copyfileobj(response, f, DOWNLOAD_CHUNK_SIZE)
+
+    if not fresh:
+      # Prefetches run in parallel threads, serialise the read-modify-write
+      with self._download_cache_lock:
+        cache = self._load_download_cache()
+        cache[url] = {'etag': etag, 'size': cached_path.stat().st_size, 'path': str(cached_path)}
+        DOWNLOAD_CACHE.write_text(json.dumps(cache, indent=2))
+
+    return cached_path
 
   def install_crane(self):
     """Install crane tool"""
@@ -57,24 +153,11 @@ class CloudMirrorSetup:
 
     print("Installing crane...")
 
-    # Get latest version
-    result = self._run_command([
-      'curl', '-s',
-      'https://api.github.com/repos/google/go-containerregistry/releases/latest'
-    ])
-
-    import json
-    release_data = json.loads(result.stdout)
-    version = release_data['tag_name']
-
     # Download and install
     with tempfile.TemporaryDirectory() as temp_dir:
       temp_path = Path(temp_dir)
-      archive_name = f"go-containerregistry_{self.system}_{self.arch}.tar.gz"
-      download_url = f"https://github.com/google/go-containerregistry/releases/download/{version}/{archive_name}"
-
-      archive_path = temp_path / archive_name
-      self._download_file(download_url, archive_path)
+      archive_path = temp_path / 'crane.tar.gz'
+      self._download_file(self._crane_url(), archive_path)
 
       # Extract
       self._run_command(['tar', 'xzf', str(archive_path), '-C', str(temp_path)])
@@ -102,10 +185,7 @@ class CloudMirrorSetup:
 
       if self.system == 'linux':
         zip_path = temp_path / 'awscliv2.zip'
-        self._download_file(
-          'https://awscli.amazonaws.com/awscli-exe-linux-x86_64.zip',
-          zip_path
-        )
+        self._download_file(self._aws_cli_url(), zip_path)
 
         self._run_command(['unzip', str(zip_path), '-d', str(temp_path)])
         self._run_command(['sudo', str(temp_path / 'aws' / 'install')])
@@ -113,10 +193,7 @@ class CloudMirrorSetup:
 
       elif self.system == 'darwin':
         pkg_path = temp_path / 'AWSCLIV2.pkg'
-        self._download_file(
-          'https://awscli.amazonaws.com/AWSCLIV2.pkg',
-          pkg_path
-        )
+        self._download_file(self._aws_cli_url(), pkg_path)
 
         self._run_command(['sudo', 'installer', '-pkg', str(pkg_path), '-target', '/'])
         print("✅ AWS CLI installed")
@@ -135,14 +212,19 @@ class CloudMirrorSetup:
         'sudo', 'apt-get', 'update'
       ], check=False)
 
-      self._run_command([
-        'curl', 'https://packages.cloud.google.com/apt/doc/apt-key.gpg',
-        '|', 'sudo', 'apt-key', 'add', '-'
-      ], check=False)
+      try:
+        apt_key = self._fetch('https://packages.cloud.google.com/apt/doc/apt-key.gpg')
+      except OSError as e:
+        print(f"⚠️  Could not fetch Google Cloud apt key: {e}")
+      else:
+        with tempfile.NamedTemporaryFile(suffix='.gpg') as key_file:
+          key_file.write(apt_key)
+          key_file.flush()
+          self._run_command(['sudo', 'apt-key', 'add', key_file.name], check=False)
 
       # Install
-      install_script = 'curl https://sdk.cloud.google.com | bash'
-      self._run_command(['bash', '-c', install_script])
+      install_script = self._fetch('https://sdk.cloud.google.com').decode()
+      self._run_command(['bash'], input=install_script)
       print("✅ Google Cloud CLI installed")
 
   def install_azure_cli(self):
@@ -154,8 +236,8 @@ class CloudMirrorSetup:
     print("📦 Installing Azure CLI...")
 
     if self.system == 'linux':
-      install_script = 'curl -sL https://aka.ms/InstallAzureCLIDeb | sudo bash'
-      self._run_command(['bash', '-c', install_script])
+      install_script = self._fetch('https://aka.ms/InstallAzureCLIDeb').decode()
+      self._run_command(['sudo', 'bash'], input=install_script)
       print("✅ Azure CLI installed")
 
   def install_doctl(self):
@@ -166,23 +248,10 @@ class CloudMirrorSetup:
 
     print("📦 Installing DigitalOcean CLI...")
 
-    # Get latest version
-    result = self._run_command([
-      'curl', '-s',
-      'https://api.github.com/repos/digitalocean/doctl/releases/latest'
-    ])
-
-    import json
-    release_data = json.loads(result.stdout)
-    version = release_data['tag_name']
-
     with tempfile.TemporaryDirectory() as temp_dir:
       temp_path = Path(temp_dir)
-      archive_name = f"doctl-{version.lstrip('v')}-{self.system}-{self.arch}.tar.gz"
-      download_url = f"https://github.com/digitalocean/doctl/releases/download/{version}/{archive_name}"
-
-      archive_path = temp_path / archive_name
-      self._download_file(download_url, archive_path)
+      archive_path = temp_path / 'doctl.tar.gz'
+      self._download_file(self._doctl_url(), archive_path)
 
       self._run_command(['tar', 'xzf', str(archive_path), '-C', str(temp_path)])
 
@@ -192,6 +261,31 @@ class CloudMirrorSetup:
         self._run_command(['sudo', 'chmod', '+x', '/usr/local/bin/doctl'])
         print("✅ DigitalOcean CLI installed")
 
+  async def install_tools(self):
+    """Install CLI tools, downloading the missing ones' archives concurrently"""
+    loop = asyncio.get_running_loop()
+
+    # Only the downloads are independent, fetch them all into the cache first
+    downloads = [
+      url_for for tool, url_for in (
+        ('crane', self._crane_url),
+        ('aws', self._aws_cli_url),
+        ('doctl', self._doctl_url),
+      )
+      if not shutil.which(tool)
+    ]
+    await asyncio.gather(*[
+      loop.run_in_executor(None, self._prefetch, url_for) for url_for in downloads
+    ])
+
+    # Extract and sudo steps run one at a time so password prompts don't
+    # overlap, and gcloud and az both go through apt's dpkg lock
+    self.install_crane()
+    self.install_aws_cli()
+    self.install_doctl()
+    self.install_gcloud_cli()
+    self.install_azure_cli()
+
   def setup_config(self):
     """Setup configuration files"""
     print("🔧 Setting up configuration...")
@@ -224,11 +318,7 @@ class CloudMirrorSetup:
 
     self._check_permissions()
     self.install_python_deps()
-    self.install_crane()
-    self.install_aws_cli()
-    self.install_gcloud_cli()
-    self.install_azure_cli()
-    self.install_doctl()
+    asyncio.run(self.install_tools())
     self.setup_config()
 
     print("")
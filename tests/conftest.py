@@ -0,0 +1,45 @@
+# tests/conftest.py
+# Author: Sanjeev Maharjan <me@sanjeev.au>
+
+import pytest
+from unittest.mock import Mock
+
+from core.config import Config
+from utils.logger import Logger
+
+
+@pytest.fixture
+def mock_config():
+  """Config with no providers enabled, tests switch on the ones they need"""
+  return Config(
+    image_list_file='test-list.txt',
+    max_parallel_jobs=2,
+    max_retries=2,
+    retry_delay=1,
+    target_platform='linux/amd64',
+    debug=True,
+    ecr_regions=None,
+    aws_account_id=None,
+    gcp_regions=None,
+    gcp_project_id=None,
+    gcp_service_account=None,
+    azure_regions=None,
+    azure_resource_group=None,
+    azure_acr_name=None,
+    azure_acr_name_prefix=None,
+    azure_client_id=None,
+    azure_client_secret=None,
+    azure_tenant_id=None,
+    jfrog_url=None,
+    jfrog_user=None,
+    jfrog_token=None,
+    jfrog_repository=None,
+    docr_regions=None,
+    docr_token=None,
+    docr_registry_name=None
+  )
+
+
+@pytest.fixture
+def mock_logger():
+  return Mock(spec=Logger)
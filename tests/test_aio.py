@@ -0,0 +1,48 @@
+# tests/test_aio.py
+# Author: Sanjeev Maharjan <me@sanjeev.au>
+
+import asyncio
+import pytest
+
+from utils.aio import validate_all
+from utils.types import ValidationResult
+
+
+class TestValidateAll:
+
+  @pytest.mark.asyncio
+  async def test_all_succeed(self):
+    async def ok():
+      return ValidationResult(success=True)
+
+    result = await validate_all([ok(), ok()])
+    assert result.success is True
+
+  @pytest.mark.asyncio
+  async def test_first_failure_cancels_rest(self):
+    cancelled = asyncio.Event()
+
+    async def fail():
+      return ValidationResult(success=False, message='eu-west-1 denied')
+
+    async def slow():
+      try:
+        await asyncio.sleep(30)
+      except asyncio.CancelledError:
+        cancelled.set()
+        raise
+      return ValidationResult(success=True)
+
+    result = await validate_all([slow(), fail()])
+
+    assert result.message == 'eu-west-1 denied'
+    assert cancelled.is_set()
+
+  @pytest.mark.asyncio
+  async def test_exception_is_failure(self):
+    async def boom():
+      raise RuntimeError('aws not installed')
+
+    result = await validate_all([boom()])
+    assert result.success is False
+    assert result.message == 'aws not installed'
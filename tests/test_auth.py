@@ -0,0 +1,170 @@
+# tests/test_auth.py
+# Author: Sanjeev Maharjan <me@sanjeev.au>
+
+import asyncio
+import base64
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from core.auth import RegistryAuthenticator
+from utils.types import ValidationResult
+
+
+@pytest.fixture
+def mock_config(mock_config):
+  mock_config.ecr_regions = ['us-east-1', 'eu-west-1', 'ap-southeast-2']
+  return mock_config
+
+
+@pytest.fixture
+def authenticator(mock_config, mock_logger, monkeypatch):
+  # Exercise the aws CLI path unless a test opts in to boto3
+  monkeypatch.setattr('core.auth.boto3', None)
+  return RegistryAuthenticator(mock_config, mock_logger)
+
+
+def _proc(stdout=b'', returncode=0):
+  proc = AsyncMock()
+  proc.returncode = returncode
+  proc.communicate.return_value = (stdout, b'')
+  proc.stderr.read.return_value = b''
+  return proc
+
+
+class TestRegistryAuthenticator:
+
+  @pytest.mark.asyncio
+  async def test_ecr_resolves_account_id_once(self, authenticator, mock_config):
+    with patch('asyncio.create_subprocess_exec') as mock_subprocess:
+      mock_subprocess.return_value = _proc(b'123456789012\n')
+
+      result = await authenticator._authenticate_ecr()
+
+      assert result.success is True
+      assert mock_config.aws_account_id == '123456789012'
+
+      commands = [call.args[:3] for call in mock_subprocess.call_args_list]
+      assert commands.count(('aws', 'sts', 'get-caller-identity')) == 1
+      assert commands.count(('aws', 'ecr', 'get-login-password')) == 3
+
+  @pytest.mark.asyncio
+  async def test_ecr_uses_configured_account_id(self, authenticator, mock_config):
+    mock_config.aws_account_id = '210987654321'
+
+    with patch('asyncio.create_subprocess_exec') as mock_subprocess:
+      mock_subprocess.return_value = _proc(b'token')
+
+      result = await authenticator._authenticate_ecr()
+
+      assert result.success is True
+      commands = [call.args[:3] for call in mock_subprocess.call_args_list]
+      assert ('aws', 'sts', 'get-caller-identity') not in commands
+      assert any('210987654321.dkr.ecr.eu-west-1.amazonaws.com' in call.args
+                 for call in mock_subprocess.call_args_list)
+
+  @pytest.mark.asyncio
+  async def test_gar_configures_every_region(self, authenticator, mock_config):
+    mock_config.gcp_regions = ['us-central1', 'europe-west1']
+
+    with patch('asyncio.create_subprocess_exec') as mock_subprocess:
+      mock_subprocess.return_value = _proc()
+
+      result = await authenticator._authenticate_gar()
+
+      assert result.success is True
+      mock_subprocess.assert_called_once()
+      assert mock_subprocess.call_args.args[3] == (
+        'us-central1-docker.pkg.dev,europe-west1-docker.pkg.dev'
+      )
+
+  @pytest.mark.asyncio
+  @pytest.mark.parametrize('jfrog_url, host', [
+    ('https://myorg.jfrog.io', 'myorg.jfrog.io'),
+    ('myorg.jfrog.io', 'myorg.jfrog.io'),
+    ('myorg.jfrog.io/artifactory', 'myorg.jfrog.io'),
+    ('jfrog.local:8082', 'jfrog.local:8082'),
+    ('http://10.0.0.5:8082/', '10.0.0.5:8082'),
+  ])
+  async def test_jfrog_login_host(self, authenticator, mock_config, jfrog_url, host):
+    mock_config.jfrog_url = jfrog_url
+    mock_config.jfrog_user = 'mirror'
+    mock_config.jfrog_token = 'secret'
+
+    with patch('asyncio.create_subprocess_exec') as mock_subprocess:
+      mock_subprocess.return_value = _proc()
+
+      result = await authenticator._authenticate_jfrog()
+
+      assert result.success is True
+      assert mock_subprocess.call_args.args[-1] == host
+
+  @pytest.mark.asyncio
+  async def test_authenticate_all_stops_at_first_failure(self, authenticator, mock_config):
+    mock_config.jfrog_url = 'https://test.jfrog.io'
+    slow_finished = False
+
+    async def slow_ecr():
+      nonlocal slow_finished
+      await asyncio.sleep(10)
+      slow_finished = True
+      return ValidationResult(success=True)
+
+    authenticator._authenticate_ecr = slow_ecr
+    authenticator._authenticate_jfrog = AsyncMock(
+      return_value=ValidationResult(success=False, message="JFrog authentication failed")
+    )
+
+    result = await asyncio.wait_for(authenticator.authenticate_all(), timeout=1)
+
+    assert result.success is False
+    assert 'JFrog authentication failed' in result.message
+    assert slow_finished is False
+
+  @pytest.mark.asyncio
+  async def test_ecr_uses_boto3_when_available(self, authenticator, mock_config, monkeypatch):
+    session = Mock()
+    session.client.return_value.get_caller_identity.return_value = {'Account': '123456789012'}
+    session.client.return_value.get_authorization_token.return_value = {
+      'authorizationData': [{'authorizationToken': base64.b64encode(b'AWS:secret').decode()}]
+    }
+    monkeypatch.setattr('core.auth.boto3', Mock(session=Mock(Session=Mock(return_value=session))))
+
+    with patch('asyncio.create_subprocess_exec') as mock_subprocess:
+      mock_subprocess.return_value = _proc()
+
+      result = await authenticator._authenticate_ecr()
+
+      assert result.success is True
+      assert mock_config.aws_account_id == '123456789012'
+      assert all(call.args[0] == 'crane' for call in mock_subprocess.call_args_list)
+      assert mock_subprocess.call_args.args[6] == 'secret'
+
+  @pytest.mark.asyncio
+  async def test_ecr_fails_when_no_region_logs_in(self, authenticator, mock_config):
+    mock_config.aws_account_id = '123456789012'
+
+    with patch('asyncio.create_subprocess_exec') as mock_subprocess:
+      mock_subprocess.return_value = _proc(returncode=1)
+
+      result = await authenticator._authenticate_ecr()
+
+      assert result.success is False
+      assert 'every region' in result.message
+
+  @pytest.mark.asyncio
+  async def test_ecr_succeeds_when_some_regions_log_in(self, authenticator, mock_config):
+    mock_config.aws_account_id = '123456789012'
+
+    async def login_region(region, account_id):
+      if region == 'eu-west-1':
+        return ValidationResult(success=False, message=f"crane login failed for ECR region {region}")
+      return ValidationResult(success=True)
+
+    authenticator._ecr_login_region = login_region
+
+    result = await authenticator._authenticate_ecr()
+
+    assert result.success is True
+    authenticator.logger.warning.assert_called_once_with(
+      "crane login failed for ECR region eu-west-1"
+    )
@@ -0,0 +1,39 @@
+# tests/test_config.py
+# Author: Sanjeev Maharjan <me@sanjeev.au>
+
+import os
+import pytest
+
+from core.config import ConfigManager
+
+
+@pytest.fixture
+def config_manager(monkeypatch):
+  # Keep anything the manager writes to the environment local to the test
+  monkeypatch.setattr(os, 'environ', os.environ.copy())
+  return ConfigManager(
+    image_list_file='test-list.txt',
+    max_parallel_jobs=2,
+    max_retries=2,
+    target_platform='linux/amd64',
+    debug=False
+  )
+
+
+class TestConfigManager:
+
+  def test_load_regions_conf(self, config_manager, tmp_path):
+    regions_conf = tmp_path / 'regions.conf'
+    regions_conf.write_text(
+      "# Regions\n"
+      "\n"
+      "ECR_MIRROR_AWS_REGIONS = \"us-east-1, eu-west-1\"\n"
+      "GCP_PROJECT_ID='my-project'\n"
+      "not a setting\n"
+    )
+
+    config_manager._load_regions_conf(regions_conf)
+    config = config_manager.load_config()
+
+    assert config.ecr_regions == ['us-east-1', 'eu-west-1']
+    assert config.gcp_project_id == 'my-project'
@@ -0,0 +1,98 @@
+# tests/test_crane_pool.py
+# Author: Sanjeev Maharjan <me@sanjeev.au>
+
+import asyncio
+import sys
+import pytest
+from unittest.mock import Mock
+
+from registries.crane_pool import CranePool, job_from_args
+from utils.logger import Logger
+
+FAKE_DAEMON = """#!{python}
+import json, sys
+for line in sys.stdin:
+  job = json.loads(line)
+  ok = job['src'] != 'missing'
+  if job['src'] == 'noisy':
+    print('panic: not a result', flush=True)
+  if job['src'] == 'unparsed':
+    print(json.dumps({{'id': 0, 'ok': False, 'error': 'invalid character'}}), flush=True)
+  print(json.dumps({{'id': job['id'], 'ok': ok, 'error': '' if ok else 'not found'}}), flush=True)
+"""
+
+
+@pytest.fixture
+def fake_daemon(tmp_path):
+  path = tmp_path / 'crane-daemon'
+  path.write_text(FAKE_DAEMON.format(python=sys.executable))
+  path.chmod(0o755)
+  return str(path)
+
+
+class TestCranePool:
+
+  def test_job_from_args(self):
+    assert job_from_args(('copy', 'a', 'b', '--platform', 'linux/arm64')) == {
+      'op': 'copy', 'src': 'a', 'dst': 'b', 'platform': 'linux/arm64'
+    }
+    assert job_from_args(('copy', 'a', 'b'))['platform'] == ''
+    assert job_from_args(('digest', 'a', '--platform', 'linux/amd64')) == {
+      'op': 'digest', 'src': 'a', 'dst': '', 'platform': 'linux/amd64'
+    }
+    assert job_from_args(('ls', 'a')) is None
+
+  def test_unavailable_without_daemon(self, monkeypatch):
+    monkeypatch.setattr('registries.crane_pool.shutil.which', lambda name: None)
+
+    pool = CranePool(Mock(spec=Logger), 2)
+    assert pool.available is False
+
+  def test_daemon_found_on_path(self, monkeypatch, fake_daemon):
+    monkeypatch.setattr('registries.crane_pool.shutil.which', lambda name: fake_daemon)
+
+    pool = CranePool(Mock(spec=Logger), 2)
+    assert pool.available is True
+    assert pool.daemon_path == fake_daemon
+
+  @pytest.mark.asyncio
+  async def test_execute_reuses_daemon(self, fake_daemon):
+    pool = CranePool(Mock(spec=Logger), 2, daemon_path=fake_daemon)
+
+    try:
+      assert await pool.execute(job_from_args(('copy', 'src', 'dst'))) == (True, '', '')
+      daemon = pool._proc
+
+      results = await asyncio.gather(
+        pool.execute(job_from_args(('copy', 'missing', 'dst'))),
+        pool.execute(job_from_args(('copy', 'src', 'dst2'))),
+        pool.execute(job_from_args(('copy', 'src', 'dst3'))),
+      )
+
+      assert results == [(False, '', 'not found'), (True, '', ''), (True, '', '')]
+      assert pool._proc is daemon
+    finally:
+      await pool.close()
+
+  @pytest.mark.asyncio
+  async def test_execute_skips_malformed_output(self, fake_daemon):
+    pool = CranePool(Mock(spec=Logger), 2, daemon_path=fake_daemon)
+
+    try:
+      assert await pool.execute(job_from_args(('copy', 'noisy', 'dst'))) == (True, '', '')
+      daemon = pool._proc
+
+      assert await pool.execute(job_from_args(('copy', 'src', 'dst'))) == (True, '', '')
+      assert pool._proc is daemon
+      assert any('malformed' in call.args[0] for call in pool.logger.debug.call_args_list)
+    finally:
+      await pool.close()
+
+  @pytest.mark.asyncio
+  async def test_zero_id_reply_resolves_no_job(self, fake_daemon):
+    pool = CranePool(Mock(spec=Logger), 2, daemon_path=fake_daemon)
+
+    try:
+      assert await pool.execute(job_from_args(('copy', 'unparsed', 'dst'))) == (True, '', '')
+    finally:
+      await pool.close()
@@ -0,0 +1,35 @@
+# tests/test_logger.py
+# Author: Sanjeev Maharjan <me@sanjeev.au>
+
+from utils.logger import Logger
+
+
+class TestLogger:
+
+  def test_levels_routed_to_streams(self, capsys):
+    logger = Logger(debug=False)
+    logger.info('copying')
+    logger.success('done')
+    logger.debug('hidden')
+    logger.error('failed')
+
+    captured = capsys.readouterr()
+    assert captured.out == (
+      f"{Logger.BLUE}[INFO]{Logger.NC} copying\n"
+      f"{Logger.GREEN}[SUCCESS]{Logger.NC} done\n"
+    )
+    assert captured.err == f"{Logger.RED}[ERROR]{Logger.NC} failed\n"
+
+  def test_debug_and_raw(self, capsys):
+    logger = Logger(debug=True)
+    logger.debug('crane: 50%')
+    logger.raw('=====')
+
+    assert capsys.readouterr().out == f"{Logger.YELLOW}[DEBUG]{Logger.NC} crane: 50%\n=====\n"
+
+  def test_debug_survives_later_logger(self, capsys):
+    logger = Logger(debug=True)
+    Logger(debug=False)
+    logger.debug('still shown')
+
+    assert capsys.readouterr().out == f"{Logger.YELLOW}[DEBUG]{Logger.NC} still shown\n"
@@ -2,67 +2,38 @@
 # Author: Sanjeev Maharjan <me@sanjeev.au>
 
 import pytest
-from unittest.mock import AsyncMock, Mock, patch, mock_open
-from pathlib import Path
-import tempfile
+from unittest.mock import AsyncMock, patch
 
 from core.mirror import ContainerMirror
-from core.config import Config
-from utils.logger import Logger
 from utils.types import ValidationResult, MirrorResult
 
 
 @pytest.fixture
-def mock_config():
-  return Config(
-    image_list_file='test-list.txt',
-    max_parallel_jobs=2,
-    max_retries=2,
-    retry_delay=1,
-    target_platform='linux/amd64',
-    debug=True,
-    ecr_regions=['us-east-1'],
-    aws_account_id='123456789012',
-    gcp_regions=None,
-    gcp_project_id=None,
-    gcp_service_account=None,
-    azure_regions=None,
-    azure_resource_group=None,
-    azure_acr_name=None,
-    azure_acr_name_prefix=None,
-    azure_client_id=None,
-    azure_client_secret=None,
-    azure_tenant_id=None,
-    jfrog_url=None,
-    jfrog_user=None,
-    jfrog_token=None,
-    jfrog_repository=None,
-    docr_regions=None,
-    docr_token=None,
-    docr_registry_name=None
-  )
-
-
-@pytest.fixture
-def mock_logger():
-  return Mock(spec=Logger)
+def container_mirror(mock_config, mock_logger):
+  return ContainerMirror(mock_config, mock_logger)
 
 
 @pytest.fixture
-def container_mirror(mock_config, mock_logger):
-  return ContainerMirror(mock_config, mock_logger)
+def write_image_list(tmp_path, mock_config):
+  def write(content):
+    image_list = tmp_path / 'image-list.txt'
+    image_list.write_text(content)
+    mock_config.image_list_file = str(image_list)
+  return write
 
 
 class TestContainerMirror:
 
   @pytest.mark.asyncio
-  async def test_validate_setup_success(self, container_mirror):
-    with patch('asyncio.create_subprocess_exec') as mock_subprocess, \
-         patch('pathlib.Path.exists', return_value=True):
+  async def test_validate_setup_success(self, container_mirror, write_image_list):
+    write_image_list('')
+
+    with patch('asyncio.create_subprocess_exec') as mock_subprocess:
 
       mock_proc = AsyncMock()
       mock_proc.returncode = 0
       mock_proc.communicate.return_value = (b'crane version', b'')
+      mock_proc.stderr.read.return_value = b''
       mock_subprocess.return_value = mock_proc
 
       container_mirror.authenticator.authenticate_all = AsyncMock(
@@ -80,9 +51,10 @@ class TestContainerMirror:
       assert 'crane tool not installed' in result.message
 
   @pytest.mark.asyncio
-  async def test_validate_setup_file_missing(self, container_mirror):
-    with patch('asyncio.create_subprocess_exec') as mock_subprocess, \
-         patch('pathlib.Path.exists', return_value=False):
+  async def test_validate_setup_file_missing(self, container_mirror, mock_config, tmp_path):
+    mock_config.image_list_file = str(tmp_path / 'missing-list.txt')
+
+    with patch('asyncio.create_subprocess_exec') as mock_subprocess:
 
       mock_proc = AsyncMock()
       mock_proc.returncode = 0
@@ -92,7 +64,8 @@ class TestContainerMirror:
       assert result.success is False
       assert 'Image list file not found' in result.message
 
-  def test_load_image_list_valid(self, container_mirror):
+  @pytest.mark.asyncio
+  async def test_load_image_list_valid(self, container_mirror, write_image_list):
     test_content = """# Test images
 ECR docker.io/library/nginx:latest
 GAR,ACR docker.io/library/redis:6
@@ -103,58 +76,93 @@ JFROG quay.io/prometheus/prometheus:v2.40.0
 DOCR ghcr.io/grafana/grafana:9.0.0
 """
 
-    with patch('builtins.open', mock_open(read_data=test_content)):
-      images = container_mirror._load_image_list()
+    write_image_list(test_content)
+    images = await container_mirror._load_image_list()
+
+    assert len(images) == 4
+    assert images[0]['destinations'] == ['ECR']
+    assert images[0]['source'] == 'docker.io/library/nginx:latest'
+    assert images[1]['destinations'] == ['GAR', 'ACR']
+    assert images[1]['source'] == 'docker.io/library/redis:6'
+
+  @pytest.mark.asyncio
+  async def test_load_image_list_across_chunks(self, container_mirror, write_image_list,
+                                               monkeypatch):
+    monkeypatch.setattr('core.mirror.IMAGE_LIST_CHUNK_SIZE', 7)
+    write_image_list("ECR docker.io/library/nginx:latest\r\n\nGAR,ACR docker.io/library/redis:6")
+
+    images = await container_mirror._load_image_list()
 
-      assert len(images) == 4
-      assert images[0]['destinations'] == ['ECR']
-      assert images[0]['source'] == 'docker.io/library/nginx:latest'
-      assert images[1]['destinations'] == ['GAR', 'ACR']
-      assert images[1]['source'] == 'docker.io/library/redis:6'
+    assert [image['source'] for image in images] == [
+      'docker.io/library/nginx:latest', 'docker.io/library/redis:6'
+    ]
+    assert images[1]['line_number'] == 3
 
-  def test_load_image_list_invalid_format(self, container_mirror, mock_logger):
+  @pytest.mark.asyncio
+  async def test_load_image_list_invalid_format(self, container_mirror, mock_logger,
+                                                write_image_list):
     test_content = """ECR
 GAR invalid-format
 INVALID docker.io/nginx:latest
 """
 
-    with patch('builtins.open', mock_open(read_data=test_content)):
-      images = container_mirror._load_image_list()
+    write_image_list(test_content)
+    images = await container_mirror._load_image_list()
 
-      assert len(images) == 0
-      assert mock_logger.warning.call_count >= 2
+    assert len(images) == 0
+    assert mock_logger.warning.call_count >= 2
 
-  def test_load_image_list_invalid_destination(self, container_mirror, mock_logger):
-    test_content = """UNKNOWN docker.io/nginx:latest"""
+  @pytest.mark.asyncio
+  async def test_load_image_list_invalid_destination(self, container_mirror, mock_logger,
+                                                     write_image_list):
+    test_content = """UNKNOWN docker.io/nginx:latest
+ECR,UNKNOWN docker.io/nginx:latest
+ECR,GAR	docker.io/library/redis:7
+"""
 
-    with patch('builtins.open', mock_open(read_data=test_content)):
-      images = container_mirror._load_image_list()
+    write_image_list(test_content)
+    images = await container_mirror._load_image_list()
 
-      assert len(images) == 0
-      mock_logger.warning.assert_called()
+    assert [image['destinations'] for image in images] == [['ECR', 'GAR']]
+    assert mock_logger.warning.call_count == 2
 
   @pytest.mark.asyncio
-  async def test_run_success(self, container_mirror):
-    test_content = """ECR docker.io/library/nginx:latest"""
+  async def test_load_image_list_invalid_encoding(self, container_mirror, mock_logger,
+                                                  mock_config, tmp_path):
+    image_list = tmp_path / 'image-list.txt'
+    image_list.write_bytes(
+      b"ECR docker.io/library/nginx:latest\n"
+      b"GAR docker.io/library/caf\xe9:1\n"
+      b"ECR docker.io/library/redis:7\n"
+    )
+    mock_config.image_list_file = str(image_list)
 
-    with patch('builtins.open', mock_open(read_data=test_content)):
-      container_mirror.authenticator.authenticate_all = AsyncMock(
-        return_value=ValidationResult(success=True)
-      )
+    images = await container_mirror._load_image_list()
 
-      container_mirror.processor.process_images = AsyncMock(
-        return_value=MirrorResult(
-          total_images=1,
-          successful_images=1,
-          failed_images=0
-        )
+    assert [image['line_number'] for image in images] == [1, 3]
+    mock_logger.warning.assert_called_once_with("Line 2: Invalid encoding, skipping")
+
+  @pytest.mark.asyncio
+  async def test_run_success(self, container_mirror, write_image_list):
+    write_image_list("""ECR docker.io/library/nginx:latest""")
+
+    container_mirror.authenticator.authenticate_all = AsyncMock(
+      return_value=ValidationResult(success=True)
+    )
+
+    container_mirror.processor.process_images = AsyncMock(
+      return_value=MirrorResult(
+        total_images=1,
+        successful_images=1,
+        failed_images=0
       )
+    )
 
-      result = await container_mirror.run()
+    result = await container_mirror.run()
 
-      assert result.total_images == 1
-      assert result.successful_images == 1
-      assert result.failed_images == 0
+    assert result.total_images == 1
+    assert result.successful_images == 1
+    assert result.failed_images == 0
 
   @pytest.mark.asyncio
   async def test_run_auth_failure(self, container_mirror):
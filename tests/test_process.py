@@ -0,0 +1,105 @@
+# tests/test_process.py
+# Author: Sanjeev Maharjan <me@sanjeev.au>
+
+import asyncio
+import os
+import sys
+import pytest
+
+from utils import process
+from utils.process import run_command, stream_command
+
+SCRIPT = "import sys; print('out'); print('err', file=sys.stderr); sys.exit(int(sys.argv[1]))"
+
+
+class TestRunCommand:
+
+  @pytest.mark.asyncio
+  async def test_capture(self):
+    assert await run_command(sys.executable, '-c', SCRIPT, '0') == (True, 'out', 'err')
+
+  @pytest.mark.asyncio
+  async def test_discard_stdout(self):
+    assert await run_command(sys.executable, '-c', SCRIPT, '1', capture=False) == (
+      False, '', 'err'
+    )
+
+  @pytest.mark.asyncio
+  async def test_missing_executable(self):
+    success, stdout, stderr = await run_command('definitely-not-a-command')
+    assert success is False
+    assert stderr
+
+  @pytest.mark.asyncio
+  async def test_executable_resolved_once(self, monkeypatch):
+    lookups = []
+
+    def which(name):
+      lookups.append(name)
+      return sys.executable
+
+    monkeypatch.setattr(process.shutil, 'which', which)
+    process._which.cache_clear()
+
+    try:
+      assert (await run_command('python-alias', '-c', SCRIPT, '0'))[0] is True
+      assert (await run_command('python-alias', '-c', SCRIPT, '0'))[0] is True
+    finally:
+      process._which.cache_clear()
+
+    assert lookups == ['python-alias']
+
+  @pytest.mark.asyncio
+  async def test_cancel_kills_child(self, tmp_path):
+    pid_file = tmp_path / 'pid'
+    script = (
+      f"import os, time; open({str(pid_file)!r}, 'w').write(str(os.getpid())); "
+      "time.sleep(30)"
+    )
+
+    with pytest.raises(asyncio.TimeoutError):
+      await asyncio.wait_for(run_command(sys.executable, '-c', script), timeout=1)
+
+    pid = int(pid_file.read_text())
+    for _ in range(50):
+      try:
+        os.kill(pid, 0)
+      except ProcessLookupError:
+        break
+      await asyncio.sleep(0.05)
+    else:
+      pytest.fail('child still running after cancellation')
+
+
+class TestStreamCommand:
+
+  @pytest.mark.asyncio
+  async def test_keeps_stderr_tail(self):
+    script = "import sys\nfor i in range(100): print(f'line {i}', file=sys.stderr)\nsys.exit(1)"
+    seen = []
+
+    success, stdout, stderr = await stream_command(
+      sys.executable, '-c', script, on_line=seen.append, tail=2
+    )
+
+    assert success is False
+    assert stdout == ''
+    assert stderr == 'line 98\nline 99'
+    assert len(seen) == 100
+
+  @pytest.mark.asyncio
+  async def test_read_failure_kills_child(self, tmp_path):
+    pid_file = tmp_path / 'pid'
+    script = (
+      f"import os, sys, time; open({str(pid_file)!r}, 'w').write(str(os.getpid())); "
+      "sys.stderr.write('x' * (2 * 1024 * 1024)); sys.stderr.flush(); time.sleep(30)"
+    )
+
+    success, _, stderr = await asyncio.wait_for(
+      stream_command(sys.executable, '-c', script), timeout=10
+    )
+
+    assert success is False
+    assert stderr
+    with pytest.raises(ProcessLookupError):
+      os.kill(int(pid_file.read_text()), 0)
@@ -0,0 +1,126 @@
+# tests/test_processor.py
+# Author: Sanjeev Maharjan <me@sanjeev.au>
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from core.processor import ImageProcessor
+
+
+@pytest.fixture
+def processor(mock_config, mock_logger):
+  mock_config.retry_delay = 0
+  return ImageProcessor(mock_config, mock_logger)
+
+
+def _image(destinations, source='docker.io/library/nginx:latest', line_number=1):
+  return {'destinations': destinations, 'source': source, 'line_number': line_number}
+
+
+class TestImageProcessor:
+
+  @pytest.mark.asyncio
+  async def test_parallel_processing(self, processor):
+    started = []
+    both_started = asyncio.Event()
+
+    async def push_image(source):
+      started.append(source)
+      if len(started) == 2:
+        both_started.set()
+      await asyncio.wait_for(both_started.wait(), timeout=1)
+      return True
+
+    registries = {
+      'ECR': Mock(push_image=push_image),
+      'GAR': Mock(push_image=push_image),
+    }
+
+    result = await processor.process_images([_image(['ECR', 'GAR'])], registries)
+
+    assert result.successful_images == 1
+    assert result.failed_images == 0
+
+  @pytest.mark.asyncio
+  async def test_retries_failed_destination(self, processor):
+    registries = {'ECR': Mock(push_image=AsyncMock(side_effect=[False, True]))}
+
+    result = await processor.process_images([_image(['ECR'])], registries)
+
+    assert result.successful_images == 1
+    assert registries['ECR'].push_image.await_count == 2
+
+  @pytest.mark.asyncio
+  async def test_unknown_destination_fails(self, processor):
+    registries = {'ECR': Mock(push_image=AsyncMock(return_value=True))}
+
+    result = await processor.process_images([_image(['ECR', 'GAR'])], registries)
+
+    assert result.failed_images == 1
+
+  @pytest.mark.asyncio
+  async def test_concurrency_bounded_by_jobs(self, processor):
+    in_flight = 0
+    peak = 0
+
+    async def push_image(source):
+      nonlocal in_flight, peak
+      in_flight += 1
+      peak = max(peak, in_flight)
+      await asyncio.sleep(0)
+      in_flight -= 1
+      return True
+
+    images = [_image(['ECR'], source=f'docker.io/library/app{i}:1', line_number=i)
+              for i in range(10)]
+
+    result = await processor.process_images(images, {'ECR': Mock(push_image=push_image)})
+
+    assert result.successful_images == 10
+    assert peak == 2
+
+  @pytest.mark.asyncio
+  async def test_consumes_async_iterable(self, processor):
+    async def images():
+      for i in range(5):
+        yield _image(['ECR'], source=f'docker.io/library/app{i}:1', line_number=i)
+
+    registries = {'ECR': Mock(push_image=AsyncMock(return_value=True))}
+    result = await processor.process_images(images(), registries)
+
+    assert result.total_images == 5
+    assert result.successful_images == 5
+
+  @pytest.mark.asyncio
+  async def test_producer_failure_cancels_workers(self, processor):
+    started = asyncio.Event()
+    cancelled = []
+
+    async def push_image(source):
+      started.set()
+      try:
+        await asyncio.sleep(10)
+      except asyncio.CancelledError:
+        cancelled.append(source)
+        raise
+      return True
+
+    async def images():
+      yield _image(['ECR'])
+      await started.wait()
+      raise ValueError("Invalid format at line 2")
+
+    registries = {'ECR': Mock(push_image=push_image)}
+    with pytest.raises(ValueError):
+      await asyncio.wait_for(processor.process_images(images(), registries), timeout=1)
+
+    assert cancelled == ['docker.io/library/nginx:latest']
+
+  def test_retry_delay_backs_off_with_cap(self, processor, mock_config):
+    mock_config.retry_delay = 5
+    mock_config.retry_backoff_cap = 30
+
+    assert 2.5 <= processor._retry_delay(1) <= 7.5
+    assert 5 <= processor._retry_delay(2) <= 15
+    assert 15 <= processor._retry_delay(10) <= 45
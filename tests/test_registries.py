@@ -0,0 +1,352 @@
+# tests/test_registries.py
+# Author: Sanjeev Maharjan <me@sanjeev.au>
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from registries.acr import ACRRegistry
+from registries.docr import DOCRRegistry
+from registries.ecr import ECRRegistry
+from registries.gar import GARRegistry
+from registries.jfrog import JFrogRegistry
+
+
+@pytest.fixture
+def mock_config(mock_config):
+  mock_config.azure_regions = ['eastus', 'westeurope']
+  mock_config.azure_resource_group = 'test-rg'
+  mock_config.azure_acr_name_prefix = 'test'
+  mock_config.docr_regions = ['nyc3', 'sfo3']
+  mock_config.docr_token = 'dop_v1_token'
+  mock_config.docr_registry_name = 'test-registry'
+  return mock_config
+
+
+class TestACRRegistry:
+
+  @pytest.mark.asyncio
+  async def test_push_image_all_regions(self, mock_config, mock_logger):
+    registry = ACRRegistry(mock_config, mock_logger)
+    registry._push_region = AsyncMock(return_value=True)
+
+    assert await registry.push_image('docker.io/library/nginx:1.25') is True
+
+    pushed = sorted(call.args[1] for call in registry._push_region.call_args_list)
+    assert pushed == ['eastus', 'westeurope']
+
+  @pytest.mark.asyncio
+  async def test_push_image_region_failure(self, mock_config, mock_logger):
+    registry = ACRRegistry(mock_config, mock_logger)
+    registry._push_region = AsyncMock(side_effect=[True, RuntimeError('boom')])
+
+    assert await registry.push_image('docker.io/library/nginx:1.25') is False
+
+  @pytest.mark.asyncio
+  async def test_acr_ensured_and_logged_in_once_per_run(self, mock_config, mock_logger):
+    registry = ACRRegistry(mock_config, mock_logger)
+    registry._run_command = AsyncMock(return_value=(True, '', ''))
+    registry._run_crane_command = AsyncMock(return_value=(True, '', ''))
+
+    assert await registry.push_image('docker.io/library/nginx:1.25') is True
+    assert await registry.push_image('docker.io/library/redis:7') is True
+
+    shows = [call for call in registry._run_command.call_args_list
+             if call.args[:3] == ('az', 'acr', 'show')]
+    logins = [call for call in registry._run_command.call_args_list
+              if call.args[:3] == ('az', 'acr', 'login')]
+    assert len(shows) == 2
+    assert len(logins) == 2
+
+
+class TestECRRegistry:
+
+  @pytest.fixture(autouse=True)
+  def no_boto3(self, monkeypatch):
+    monkeypatch.setattr('registries.ecr.boto3', None)
+
+  @pytest.mark.asyncio
+  async def test_push_image_resolves_account_once(self, mock_config, mock_logger):
+    mock_config.ecr_regions = ['us-east-1', 'eu-west-1']
+    registry = ECRRegistry(mock_config, mock_logger)
+    registry._run_command = AsyncMock(return_value=(True, '123456789012', ''))
+    registry._push_region = AsyncMock(return_value=True)
+
+    assert await registry.push_image('docker.io/library/nginx:1.25') is True
+
+    registry._run_command.assert_called_once()
+    pushed = sorted(call.args[1:] for call in registry._push_region.call_args_list)
+    assert pushed == [('eu-west-1', '123456789012'), ('us-east-1', '123456789012')]
+
+  @pytest.mark.asyncio
+  async def test_account_id_cached_across_images(self, mock_config, mock_logger):
+    mock_config.ecr_regions = ['us-east-1']
+    registry = ECRRegistry(mock_config, mock_logger)
+    registry._run_command = AsyncMock(return_value=(True, '123456789012\n', ''))
+    registry._push_region = AsyncMock(return_value=True)
+
+    await asyncio.gather(
+      registry.push_image('docker.io/library/nginx:1.25'),
+      registry.push_image('docker.io/library/redis:7')
+    )
+
+    registry._run_command.assert_called_once()
+    assert registry._push_region.call_args.args[2] == '123456789012'
+    assert mock_config.aws_account_id == '123456789012'
+
+  @pytest.mark.asyncio
+  async def test_account_id_from_authentication_after_init(self, mock_config, mock_logger):
+    mock_config.ecr_regions = ['us-east-1']
+    registry = ECRRegistry(mock_config, mock_logger)
+    registry._run_command = AsyncMock()
+    registry._push_region = AsyncMock(return_value=True)
+
+    # ContainerMirror builds registries before authenticate_all() resolves it
+    mock_config.aws_account_id = '210987654321'
+
+    assert await registry.push_image('docker.io/library/nginx:1.25') is True
+    registry._run_command.assert_not_called()
+    assert registry._push_region.call_args.args[2] == '210987654321'
+
+  @pytest.mark.asyncio
+  async def test_configured_account_id_skips_sts(self, mock_config, mock_logger):
+    mock_config.ecr_regions = ['us-east-1']
+    mock_config.aws_account_id = '210987654321'
+    registry = ECRRegistry(mock_config, mock_logger)
+    registry._run_command = AsyncMock()
+    registry._push_region = AsyncMock(return_value=True)
+
+    assert await registry.push_image('docker.io/library/nginx:1.25') is True
+    registry._run_command.assert_not_called()
+
+  @pytest.mark.asyncio
+  async def test_validate_access_reports_failed_region(self, mock_config, mock_logger):
+    mock_config.ecr_regions = ['us-east-1', 'eu-west-1']
+    registry = ECRRegistry(mock_config, mock_logger)
+    registry._run_command = AsyncMock(side_effect=[(True, '', ''), (False, '', 'denied')])
+
+    result = await registry.validate_access()
+
+    assert result.success is False
+    assert 'eu-west-1' in result.message
+
+  @pytest.mark.asyncio
+  async def test_repository_checked_once_per_region(self, mock_config, mock_logger):
+    mock_config.ecr_regions = ['us-east-1']
+    mock_config.aws_account_id = '123456789012'
+    registry = ECRRegistry(mock_config, mock_logger)
+    registry._run_command = AsyncMock(return_value=(True, '[]', ''))
+    registry._run_crane_command = AsyncMock(return_value=(True, '', ''))
+
+    await asyncio.gather(
+      registry.push_image('docker.io/library/nginx:1.25'),
+      registry.push_image('docker.io/library/nginx:1.26')
+    )
+
+    describes = [call for call in registry._run_command.call_args_list
+                 if call.args[:3] == ('aws', 'ecr', 'describe-repositories')]
+    # One region listing plus one lookup of the unlisted repository
+    assert len(describes) == 2
+
+  @pytest.mark.asyncio
+  async def test_warm_cache_skips_describe(self, mock_config, mock_logger):
+    mock_config.ecr_regions = ['us-east-1', 'eu-west-1']
+    mock_config.aws_account_id = '123456789012'
+    registry = ECRRegistry(mock_config, mock_logger)
+    registry._run_command = AsyncMock(return_value=(True, '["library/nginx"]', ''))
+    registry._run_crane_command = AsyncMock(return_value=(True, '', ''))
+
+    assert (await registry.validate_access()).success is True
+    assert registry._run_command.call_count == 2
+
+    assert await registry.push_image('docker.io/library/nginx:1.25') is True
+    assert registry._run_command.call_count == 2
+
+  @pytest.mark.asyncio
+  async def test_boto3_creates_missing_repository(self, mock_config, mock_logger, monkeypatch):
+    mock_config.ecr_regions = ['us-east-1']
+    mock_config.aws_account_id = '123456789012'
+    ecr = Mock()
+    ecr.get_paginator.return_value.paginate.return_value = [{'repositories': []}]
+    ecr.describe_repositories.side_effect = Exception('RepositoryNotFoundException')
+    boto3 = Mock()
+    boto3.session.Session.return_value.client.return_value = ecr
+    monkeypatch.setattr('registries.ecr.boto3', boto3)
+
+    registry = ECRRegistry(mock_config, mock_logger)
+    registry._run_command = AsyncMock()
+    registry._run_crane_command = AsyncMock(return_value=(True, '', ''))
+
+    assert await registry.push_image('docker.io/library/nginx:1.25') is True
+
+    registry._run_command.assert_not_called()
+    ecr.create_repository.assert_called_once_with(
+      repositoryName='library/nginx',
+      imageScanningConfiguration={'scanOnPush': True}
+    )
+
+
+class TestGARRegistry:
+
+  @pytest.mark.asyncio
+  async def test_push_image_all_regions(self, mock_config, mock_logger):
+    mock_config.gcp_regions = ['us-central1', 'europe-west1']
+    mock_config.gcp_project_id = 'test-project'
+    registry = GARRegistry(mock_config, mock_logger)
+    registry._push_region = AsyncMock(side_effect=[True, False])
+
+    assert await registry.push_image('docker.io/library/nginx:1.25') is False
+    assert registry._push_region.call_count == 2
+
+  @pytest.mark.asyncio
+  async def test_repository_created_once_per_region(self, mock_config, mock_logger):
+    mock_config.gcp_regions = ['us-central1']
+    mock_config.gcp_project_id = 'test-project'
+    registry = GARRegistry(mock_config, mock_logger)
+    registry._run_command = AsyncMock(side_effect=lambda *args, **kwargs: (
+      (False, '', 'NOT_FOUND') if args[3] == 'describe' else (True, '', '')
+    ))
+    registry._run_crane_command = AsyncMock(return_value=(True, '', ''))
+
+    assert await registry.push_image('docker.io/library/nginx:1.25') is True
+    assert await registry.push_image('docker.io/library/redis:7') is True
+
+    gcloud_ops = [call.args[3] for call in registry._run_command.call_args_list]
+    assert gcloud_ops == ['describe', 'create']
+
+
+class TestJFrogRegistry:
+
+  @pytest.mark.asyncio
+  async def test_push_target_has_no_scheme(self, mock_config, mock_logger):
+    mock_config.jfrog_url = 'https://myorg.jfrog.io/'
+    mock_config.jfrog_repository = 'docker-remote'
+    registry = JFrogRegistry(mock_config, mock_logger)
+    registry._run_crane_command = AsyncMock(return_value=(True, '', ''))
+
+    assert await registry.push_image('docker.io/library/redis:7') is True
+
+    assert registry._run_crane_command.call_args.args[2] == (
+      'myorg.jfrog.io/artifactory/docker-remote/library/redis:7'
+    )
+
+  @pytest.mark.asyncio
+  @pytest.mark.parametrize('jfrog_url, registry_url', [
+    ('jfrog.local:8082', 'jfrog.local:8082'),
+    ('http://10.0.0.5:8082/', '10.0.0.5:8082'),
+    ('myorg.jfrog.io/mirror', 'myorg.jfrog.io/mirror'),
+  ])
+  async def test_push_target_keeps_port(self, mock_config, mock_logger, jfrog_url, registry_url):
+    mock_config.jfrog_url = jfrog_url
+    registry = JFrogRegistry(mock_config, mock_logger)
+    registry._run_crane_command = AsyncMock(return_value=(True, '', ''))
+
+    assert await registry.push_image('docker.io/library/redis:7') is True
+
+    assert registry._run_crane_command.call_args.args[2] == (
+      f"{registry_url}/artifactory/docker-local/library/redis:7"
+    )
+
+
+class TestDOCRRegistry:
+
+  @pytest.mark.asyncio
+  async def test_push_image_copies_to_registry(self, mock_config, mock_logger):
+    registry = DOCRRegistry(mock_config, mock_logger)
+    registry._run_crane_command = AsyncMock(return_value=(True, '', ''))
+
+    assert await registry.push_image('docker.io/library/redis:7') is True
+
+    args = registry._run_crane_command.call_args.args
+    assert args[:3] == (
+      'copy', 'docker.io/library/redis:7',
+      'registry.digitalocean.com/test-registry/library/redis:7'
+    )
+
+  @pytest.mark.asyncio
+  async def test_push_image_copies_once_for_all_regions(self, mock_config, mock_logger):
+    registry = DOCRRegistry(mock_config, mock_logger)
+    registry._run_crane_command = AsyncMock(return_value=(True, '', ''))
+
+    assert await registry.push_image('docker.io/library/redis:7') is True
+
+    copies = [call for call in registry._run_crane_command.call_args_list
+              if call.args[0] == 'copy']
+    assert len(mock_config.docr_regions) == 2
+    assert len(copies) == 1
+
+
+class TestBaseRegistry:
+
+  @pytest.mark.asyncio
+  async def test_push_skips_up_to_date_target(self, mock_config, mock_logger):
+    registry = DOCRRegistry(mock_config, mock_logger)
+    registry._run_crane_command = AsyncMock(return_value=(True, 'sha256:abc', ''))
+
+    assert await registry.push_image('docker.io/library/redis:7') is True
+
+    ops = [call.args[0] for call in registry._run_crane_command.call_args_list]
+    assert 'copy' not in ops
+
+  @pytest.mark.asyncio
+  async def test_source_digest_shared_between_registries(self, mock_config, mock_logger):
+    cache = {}
+    first = DOCRRegistry(mock_config, mock_logger, cache)
+    second = ACRRegistry(mock_config, mock_logger, cache)
+    first._run_crane_command = AsyncMock(return_value=(True, 'sha256:abc', ''))
+    second._run_crane_command = AsyncMock(return_value=(True, 'sha256:def', ''))
+
+    assert await first._source_digest('docker.io/library/redis:7') == 'sha256:abc'
+    assert await second._source_digest('docker.io/library/redis:7') == 'sha256:abc'
+    second._run_crane_command.assert_not_called()
+
+  @pytest.mark.asyncio
+  async def test_concurrent_source_digest_lookups_shared(self, mock_config, mock_logger):
+    registry = DOCRRegistry(mock_config, mock_logger)
+    registry._run_crane_command = AsyncMock(side_effect=[(False, '', 'timeout'),
+                                                         (True, 'sha256:abc', '')])
+
+    digests = await asyncio.gather(*[
+      registry._source_digest('docker.io/library/redis:7') for _ in range(3)
+    ])
+    assert digests == [None, None, None]
+
+    # Failed lookups aren't cached, the next attempt resolves again
+    assert await registry._source_digest('docker.io/library/redis:7') == 'sha256:abc'
+    assert registry._run_crane_command.call_count == 2
+
+  @pytest.mark.parametrize('source, expected', [
+    ('docker.io/library/nginx:1.25', ('library/nginx', '1.25')),
+    ('quay.io/prometheus/prometheus:v2.40.0', ('prometheus/prometheus', 'v2.40.0')),
+    ('nginx:latest', ('nginx', 'latest')),
+    ('ghcr.io/grafana/grafana', ('grafana/grafana', 'latest')),
+    ('localhost:5000/app', ('app', 'latest')),
+  ])
+  def test_parse_image(self, mock_config, mock_logger, source, expected):
+    registry = DOCRRegistry(mock_config, mock_logger)
+    assert registry._parse_image(source) == expected
+
+  @pytest.mark.asyncio
+  async def test_subprocesses_bounded_by_jobs(self, mock_config, mock_logger, monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def run_command(*args, capture=True):
+      nonlocal in_flight, peak
+      in_flight += 1
+      peak = max(peak, in_flight)
+      await asyncio.sleep(0)
+      in_flight -= 1
+      return True, '', ''
+
+    monkeypatch.setattr('registries.base.run_command', run_command)
+    registry = DOCRRegistry(mock_config, mock_logger)
+
+    await asyncio.gather(*[registry._run_command('doctl', 'registry', 'get') for _ in range(6)])
+
+    assert peak == mock_config.max_parallel_jobs
+
+  def test_rate_limit_from_config(self, mock_config, mock_logger):
+    mock_config.acr_qps = 3
+    registry = ACRRegistry(mock_config, mock_logger)
+    assert registry._throttler.rate_limit == 3
@@ -0,0 +1,5 @@
+module github.com/sanjeevma/multi-cloud-mirror-python/tools/crane-daemon
+
+go 1.21
+
+require github.com/google/go-containerregistry v0.20.2
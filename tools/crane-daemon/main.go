@@ -0,0 +1,105 @@
+// tools/crane-daemon/main.go
+// Author: Sanjeev Maharjan <me@sanjeev.au>
+//
+// crane-daemon is a long-lived crane worker. It reads newline-delimited JSON
+// jobs on stdin and answers each one with a JSON line on stdout carrying the
+// same id. Jobs run concurrently inside the one process, so every copy and
+// digest lookup against a registry shares its HTTP connections and auth
+// instead of exec'ing crane per call.
+//
+//	{"id": 1, "op": "copy", "src": "...", "dst": "...", "platform": "linux/amd64"}
+//	{"id": 1, "ok": true}
+//	{"id": 2, "op": "digest", "src": "...", "platform": "linux/amd64"}
+//	{"id": 2, "ok": true, "output": "sha256:..."}
+package main
+
+import (
+	"bufio"
+	"encoding/json"
+	"fmt"
+	"os"
+	"sync"
+
+	"github.com/google/go-containerregistry/pkg/crane"
+	v1 "github.com/google/go-containerregistry/pkg/v1"
+)
+
+type job struct {
+	ID       int64  `json:"id"`
+	Op       string `json:"op"`
+	Src      string `json:"src"`
+	Dst      string `json:"dst"`
+	Platform string `json:"platform"`
+}
+
+type result struct {
+	ID     int64  `json:"id"`
+	OK     bool   `json:"ok"`
+	Output string `json:"output,omitempty"`
+	Error  string `json:"error,omitempty"`
+}
+
+func run(j job) (string, error) {
+	var opts []crane.Option
+	if j.Platform != "" {
+		platform, err := v1.ParsePlatform(j.Platform)
+		if err != nil {
+			return "", err
+		}
+		opts = append(opts, crane.WithPlatform(platform))
+	}
+
+	switch j.Op {
+	case "copy":
+		return "", crane.Copy(j.Src, j.Dst, opts...)
+	case "digest":
+		return crane.Digest(j.Src, opts...)
+	default:
+		return "", fmt.Errorf("unsupported op %q", j.Op)
+	}
+}
+
+func main() {
+	scanner := bufio.NewScanner(os.Stdin)
+	scanner.Buffer(make([]byte, 64*1024), 1024*1024)
+	encoder := json.NewEncoder(os.Stdout)
+
+	var (
+		mu sync.Mutex
+		wg sync.WaitGroup
+	)
+
+	reply := func(res result) {
+		mu.Lock()
+		defer mu.Unlock()
+		if err := encoder.Encode(res); err != nil {
+			os.Exit(1)
+		}
+	}
+
+	for scanner.Scan() {
+		var j job
+		if err := json.Unmarshal(scanner.Bytes(), &j); err != nil {
+			// Clients number jobs from 1, id 0 marks a line that didn't parse
+			reply(result{ID: j.ID, Error: err.Error()})
+			continue
+		}
+
+		wg.Add(1)
+		go func(j job) {
+			defer wg.Done()
+
+			res := result{ID: j.ID}
+			if out, err := run(j); err != nil {
+				res.Error = err.Error()
+			} else {
+				res.OK = true
+				res.Output = out
+			}
+			reply(res)
+		}(j)
+	}
+
+	// Finish in-flight jobs before exiting on stdin EOF
+	wg.Wait()
+}
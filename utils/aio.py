@@ -0,0 +1,36 @@
+# utils/aio.py
+# Author: Sanjeev Maharjan <me@sanjeev.au>
+
+import asyncio
+from typing import Awaitable, Iterable, Optional
+
+from utils.types import ValidationResult
+
+
+async def validate_all(checks: Iterable[Awaitable[ValidationResult]]) -> ValidationResult:
+  """Run checks concurrently, returning the first failure and cancelling the rest
+
+  A check that raises counts as a failure with the exception as its message.
+  Stands in for asyncio.TaskGroup, which needs Python 3.11.
+  """
+  pending = {asyncio.ensure_future(check) for check in checks}
+  failure: Optional[ValidationResult] = None
+
+  try:
+    while pending and failure is None:
+      done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+      for task in done:
+        if failure is not None:
+          break
+        if task.exception() is not None:
+          failure = ValidationResult(success=False, message=str(task.exception()))
+        elif not task.result().success:
+          failure = task.result()
+  finally:
+    # Also runs when the caller is cancelled, so no check is left behind
+    for task in pending:
+      task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+  return failure or ValidationResult(success=True)
@@ -1,8 +1,26 @@
 # utils/logger.py
 # Author: Sanjeev Maharjan <me@sanjeev.au>
 
+import logging
 import sys
-from typing import Optional
+from typing import Dict
+
+SUCCESS = 25
+logging.addLevelName(SUCCESS, 'SUCCESS')
+
+
+class _ColorFormatter(logging.Formatter):
+  """Prefix records with their colored level, raw records pass through"""
+
+  def __init__(self, prefixes: Dict[int, str]):
+    super().__init__()
+    self._prefixes = prefixes
+
+  def format(self, record: logging.LogRecord) -> str:
+    message = record.getMessage()
+    if getattr(record, 'raw', False):
+      return message
+    return self._prefixes.get(record.levelno, '') + message
 
 
 class Logger:
@@ -16,27 +34,53 @@ class Logger:
   def __init__(self, debug: bool = False):
     self.debug_enabled = debug
 
+    # Prefixes never change, build them once rather than per message
+    formatter = _ColorFormatter({
+      logging.INFO: f"{self.BLUE}[INFO]{self.NC} ",
+      SUCCESS: f"{self.GREEN}[SUCCESS]{self.NC} ",
+      logging.WARNING: f"{self.YELLOW}[WARNING]{self.NC} ",
+      logging.ERROR: f"{self.RED}[ERROR]{self.NC} ",
+      logging.DEBUG: f"{self.YELLOW}[DEBUG]{self.NC} ",
+    })
+
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.addFilter(lambda record: record.levelno < logging.ERROR)
+    stdout_handler.setFormatter(formatter)
+
+    stderr_handler = logging.StreamHandler(sys.stderr)
+    stderr_handler.setLevel(logging.ERROR)
+    stderr_handler.setFormatter(formatter)
+
+    # The stdlib logger is shared by every Logger, so leave its level open
+    # and let each instance's debug_enabled decide
+    self._logger = logging.getLogger('multi-cloud-mirror')
+    self._logger.setLevel(logging.DEBUG)
+    self._logger.handlers = [stdout_handler, stderr_handler]
+    self._logger.propagate = False
+
   def info(self, message: str):
     """Log info message"""
-    print(f"{self.BLUE}[INFO]{self.NC} {message}")
+    self._logger.info(message)
 
   def success(self, message: str):
     """Log success message"""
-    print(f"{self.GREEN}[SUCCESS]{self.NC} {message}")
+    self._logger.log(SUCCESS, message)
 
   def warning(self, message: str):
     """Log warning message"""
-    print(f"{self.YELLOW}[WARNING]{self.NC} {message}")
+    self._logger.warning(message)
 
   def error(self, message: str):
     """Log error message"""
-    print(f"{self.RED}[ERROR]{self.NC} {message}", file=sys.stderr)
+    self._logger.error(message)
 
   def debug(self, message: str):
     """Log debug message if debug is enabled"""
-    if self.debug_enabled:
-      print(f"{self.YELLOW}[DEBUG]{self.NC} {message}")
+    if not self.debug_enabled:
+      return
+
+    self._logger.debug(message)
 
   def raw(self, message: str):
     """Print raw message without formatting"""
-    print(message)
+    self._logger.info(message, extra={'raw': True})
@@ -0,0 +1,121 @@
+# utils/process.py
+# Author: Sanjeev Maharjan <me@sanjeev.au>
+
+import asyncio
+import atexit
+import collections
+import functools
+import os
+import shutil
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+_devnull_fd: Optional[int] = None
+
+
+def _devnull() -> int:
+  """Return a write-only /dev/null descriptor shared by all spawns"""
+  global _devnull_fd
+  if _devnull_fd is None:
+    _devnull_fd = os.open(os.devnull, os.O_WRONLY | getattr(os, 'O_CLOEXEC', 0))
+    atexit.register(os.close, _devnull_fd)
+  return _devnull_fd
+
+
+@functools.lru_cache(maxsize=None)
+def _which(executable: str) -> str:
+  """Resolve an executable on PATH once per process"""
+  # Spares execvp a stat() per PATH entry on every spawn. Unresolved names
+  # pass through so the spawn still fails with the usual error.
+  return shutil.which(executable) or executable
+
+
+async def _reap_on_cancel(proc: asyncio.subprocess.Process, awaitable: Awaitable[Any]) -> Any:
+  """Await the child's output, killing the child if the caller is cancelled"""
+  try:
+    return await awaitable
+  except asyncio.CancelledError:
+    _kill(proc)
+    raise
+
+
+def _kill(proc: asyncio.subprocess.Process):
+  """Kill the child unless it has already exited"""
+  if proc.returncode is None:
+    try:
+      proc.kill()
+    except ProcessLookupError:
+      pass
+
+
+async def run_command(*args, capture: bool = True) -> Tuple[bool, str, str]:
+  """Run command and return success, stdout, stderr
+
+  With capture=False stdout is discarded instead of being buffered and
+  decoded, stderr is still collected for error messages.
+  """
+  try:
+    if not capture:
+      proc = await asyncio.create_subprocess_exec(
+        _which(args[0]), *args[1:],
+        stdout=_devnull(),
+        stderr=asyncio.subprocess.PIPE
+      )
+      # Only one pipe to drain, so skip communicate() and its reader tasks.
+      # stderr is read to EOF before waiting so a chatty child cannot block.
+      stderr = await _reap_on_cancel(proc, proc.stderr.read())
+      await proc.wait()
+
+      return proc.returncode == 0, '', stderr.decode().strip()
+
+    proc = await asyncio.create_subprocess_exec(
+      _which(args[0]), *args[1:],
+      stdout=asyncio.subprocess.PIPE,
+      stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await _reap_on_cancel(proc, proc.communicate())
+
+    return (
+      proc.returncode == 0,
+      stdout.decode().strip(),
+      stderr.decode().strip()
+    )
+  except Exception as e:
+    return False, '', str(e)
+
+
+async def stream_command(*args, on_line: Optional[Callable[[str], None]] = None,
+                         tail: int = 64) -> Tuple[bool, str, str]:
+  """Run command following stderr line by line, return success, stdout, stderr
+
+  stdout is discarded and only the last `tail` stderr lines are kept for the
+  error message, so memory stays flat however much the command logs.
+  """
+  proc = None
+  try:
+    proc = await asyncio.create_subprocess_exec(
+      _which(args[0]), *args[1:],
+      stdout=_devnull(),
+      stderr=asyncio.subprocess.PIPE,
+      limit=1024 * 1024
+    )
+
+    lines: collections.deque = collections.deque(maxlen=tail)
+
+    async def follow():
+      async for raw in proc.stderr:
+        line = raw.decode(errors='replace').rstrip()
+        lines.append(line)
+        if on_line is not None:
+          on_line(line)
+
+    await _reap_on_cancel(proc, follow())
+    await proc.wait()
+
+    return proc.returncode == 0, '', '\n'.join(lines).strip()
+  except Exception as e:
+    # A failed read (e.g. a line over the limit) would leave the child
+    # blocked on a stderr pipe nobody drains
+    if proc is not None:
+      _kill(proc)
+      await proc.wait()
+    return False, '', str(e)
@@ -1,18 +1,22 @@
 # utils/types.py
 # Author: Sanjeev Maharjan <me@sanjeev.au>
 
+import sys
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 
+# Slotted dataclasses drop the per-instance __dict__, Python 3.10+ only
+SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**SLOTS)
 class ValidationResult:
   success: bool
   message: Optional[str] = None
   details: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(**SLOTS)
 class MirrorResult:
   total_images: int
   successful_images: int
@@ -20,7 +24,7 @@ class MirrorResult:
   failed_image_details: Optional[List[Dict[str, str]]] = None
 
 
-@dataclass
+@dataclass(**SLOTS)
 class RegistryConfig:
   name: str
   enabled: bool
@@ -29,7 +33,7 @@ class RegistryConfig:
   credentials: Optional[Dict[str, str]] = None
 
 
-@dataclass
+@dataclass(**SLOTS)
 class ImageInfo:
   source: str
   repository: str
@@ -38,7 +42,7 @@ class ImageInfo:
   line_number: int
 
 
-@dataclass
+@dataclass(**SLOTS)
 class PushResult:
   success: bool
   source: str